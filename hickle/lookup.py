@@ -116,6 +116,12 @@ if sys.version_info[:2] <= (3,5): # pragma: no cover
 
 # %% GLOBALS
 
+# pickle protocol used for py_obj_type entries of the 'hickle_types_table' and
+# pickled datasets. Pinned to a protocol any supported Python version can load
+# to keep files portable and independent of pickle.HIGHEST_PROTOCOL and
+# pickle.DEFAULT_PROTOCOL of the Python version writing them.
+_pickle_protocol = 4
+
 # %% FUNCTION DEFINITIONS
 
 
@@ -207,7 +213,8 @@ class RecoveredGroup(dict,AttemptRecoverCustom):
 
     def __init__(self,*args,attrs={},**kwargs):
         super().__init__(*args,**kwargs)
-        self.attrs={name:value for name,value in attrs.items() if name not in {'type'}}
+        self.attrs = dict(attrs)
+        self.attrs.pop('type',None)
 
 class RecoveredDataset(np.ndarray,AttemptRecoverCustom):
     """
@@ -228,7 +235,8 @@ class RecoveredDataset(np.ndarray,AttemptRecoverCustom):
             strides=array_copy.strides,
             order = 'C' if array_copy.flags.c_contiguous else 'F'
         )
-        obj.attrs = {name:value for name,value in attrs.items() if name not in {'type'}}
+        obj.attrs = dict(attrs)
+        obj.attrs.pop('type',None)
         return obj
     
     def __array_finalize__(self,obj):
@@ -388,7 +396,8 @@ class ReferenceManager(BaseManager, dict):
         '_py_obj_type_link', # dictionary linking py_obj_type and representation in hickle_types_table
         '_base_type_link', # dictionary linking base_type string and representation in hickle_types_table
         '_overlay', # in memory hdf5 dummy file hosting dummy hickle_types_table for hickle 4.x files
-        'pickle_loads' # reference to pickle.loads method
+        'pickle_loads', # reference to pickle.loads method
+        '_recover_warned' # (base_type,py_obj_type) pairs DataRecoveredWarning was issued for
     )
 
     
@@ -509,6 +518,7 @@ class ReferenceManager(BaseManager, dict):
         self._base_type_link = dict()
         self._overlay = None
         self.pickle_loads = pickle_loads
+        self._recover_warned = set()
 
         # get the 'hickle_types_table' member of h_root_group or create it anew
         # in case none found. In case hdf5 file is opened for reading only
@@ -545,9 +555,9 @@ class ReferenceManager(BaseManager, dict):
         # '_py_obj_type_table' when dumping data to the file.
         if h_root_group.file.mode != 'r+':
             return
-        for _, entry in self._py_obj_type_table.items():
+        for name, entry in self._py_obj_type_table.items():
             if entry.shape is None and entry.dtype == 'S1':
-                base_type = entry.name.rsplit('/',1)[-1].encode('ascii')
+                base_type = name.encode('ascii')
                 self._base_type_link[base_type] = entry
                 self._base_type_link[entry.id] = base_type
                 continue
@@ -568,7 +578,7 @@ class ReferenceManager(BaseManager, dict):
                 )
             base_type = self._base_type_link.get(base_type_entry.id,None)
             if base_type is None:
-                base_type = base_type_entry.name.rsplit('/',1)[-1].encode('ascii')
+                base_type = h5.h5i.get_name(base_type_entry.id).rsplit(b'/',1)[-1]
             try:
                 py_obj_type = pickle.loads(entry[()])
             except (ImportError,AttributeError):
@@ -616,6 +626,11 @@ class ReferenceManager(BaseManager, dict):
             keyword arguments to be passed to h5py.Group.create_dataset function
             when creating the entries for py_obj_type and base_type anew
 
+        Returns
+        -------
+        the 'hickle_types_table' entry representing py_obj_type or None if
+        py_obj_type is object and h_node contains a pickle string
+
         Raises
         ------
         ValueError:
@@ -630,7 +645,7 @@ class ReferenceManager(BaseManager, dict):
         # return immediately if py_obj_type is object as h_node contains pickled byte
         # string of the actual object dumped
         if py_obj_type is object:
-            return
+            return None
 
         # if no entry within the 'hickle_types_table' exists yet
         # for py_obj_type create the corresponding pickle string dataset
@@ -646,7 +661,7 @@ class ReferenceManager(BaseManager, dict):
                 ) 
             if not isinstance(base_type,(str,bytes)) or not base_type:
                 raise ValueError("base_type must be non empty bytes string")
-            type_entry = memoryview(pickle.dumps(py_obj_type))
+            type_entry = memoryview(pickle.dumps(py_obj_type, protocol = _pickle_protocol))
             type_entry = np.array(type_entry,copy = False)
             type_entry.dtype = 'S1'
             entry = self._py_obj_type_table.create_dataset(
@@ -673,6 +688,7 @@ class ReferenceManager(BaseManager, dict):
             self._py_obj_type_link[py_obj_type_id] = entry
             self._py_obj_type_link[entry.id] = (py_obj_type,base_type)
         h_node.attrs[attr_name] = entry.ref
+        return entry
 
     def resolve_type(self,h_node,attr_name = 'type',base_type_type = 1):
         """
@@ -803,7 +819,8 @@ class ReferenceManager(BaseManager, dict):
                 if base_type is None:
 
                     # get the relative table entry name form full path name of entry node
-                    base_type = base_type_entry.name.rsplit('/',1)[-1].encode('ASCII')
+                    # which h5py.h5i.get_name already returns as bytes string
+                    base_type = h5.h5i.get_name(base_type_entry.id).rsplit(b'/',1)[-1]
                     self._base_type_link[base_type] = base_type_entry
                     self._base_type_link[base_type_entry.id] = base_type
             try:
@@ -838,6 +855,7 @@ class ReferenceManager(BaseManager, dict):
         self._py_obj_type_link = None
         self._base_type_link = None
         self.pickle_loads = None
+        self._recover_warned = None
         if self._overlay is not None:
             self._overlay()
             self._overlay = None
@@ -1436,8 +1454,12 @@ class ExpandReferenceContainer(PyContainer):
         dictionary or has to be restored from file. 
         """
 
+        # read the scalar reference directly through the low level dataset id
+        # bypassing the generic slicing machinery of h5py.Dataset.__getitem__
+        reference = np.empty((),dtype = h5.ref_dtype)
+        h_parent.id.read(h5.h5s.ALL,h5.h5s.ALL,reference)
         try:
-            referred_node = h_parent.file.get(h_parent[()],None)
+            referred_node = h_parent.file.get(reference[()],None)
         except ( ValueError, KeyError ): # pragma no cover
             referred_node = None
         if referred_node is None:
@@ -1496,7 +1518,7 @@ def create_pickled_dataset(py_obj, h_group, name, reason = None, **kwargs):
     )
 
     # store object as pickle string
-    pickled_obj = pickle.dumps(py_obj)
+    pickled_obj = pickle.dumps(py_obj, protocol = _pickle_protocol)
     d = h_group.create_dataset(name, data = memoryview(pickled_obj), **kwargs)
     return d,() 
 
@@ -1504,10 +1526,14 @@ def load_pickled_data(h_node, base_type, py_obj_type):
     """
     loade pickle string and return resulting py_obj
     """
+
+    # the pickle string is read only once and passed to pickle.loads as numpy
+    # array which exposes its memory through the buffer protocol
+    pickle_string = h_node[()]
     try:
-        return pickle.loads(h_node[()])
+        return pickle.loads(pickle_string)
     except (ImportError,AttributeError):
-        return RecoveredDataset(h_node[()],dtype = h_node.dtype,attrs = dict(h_node.attrs))
+        return RecoveredDataset(pickle_string,dtype = h_node.dtype,attrs = h_node.attrs)
 
         
 # no dump method is registered for object as this is the default for
@@ -1520,50 +1546,61 @@ def recover_custom_dataset(h_node,base_type,py_obj_type):
     """
     manager = ReferenceManager.get_manager(h_node)
     _,base_type,_ = manager.resolve_type(h_node,base_type_type = -1)
-    warnings.warn(
-        "loader '{}' missing for '{}' type object. Data recovered ({})".format(
-            base_type, 
-            py_obj_type.__name__ if not isinstance(py_obj_type, AttemptRecoverCustom) else None,
-            h_node.name.rsplit('/')[-1]
-        ),
-        DataRecoveredWarning
-    )
+
+    # report missing loader only once for each base_type and py_obj_type pair
+    if (base_type,py_obj_type) not in manager._recover_warned:
+        manager._recover_warned.add((base_type,py_obj_type))
+        warnings.warn(
+            "loader '{}' missing for '{}' type object. Data recovered ({})".format(
+                base_type, 
+                py_obj_type.__name__ if not isinstance(py_obj_type, AttemptRecoverCustom) else None,
+                h_node.name.rsplit('/')[-1]
+            ),
+            DataRecoveredWarning
+        )
     attrs = dict(h_node.attrs)
     attrs['base_type'] = base_type
     return RecoveredDataset(h_node[()],dtype=h_node.dtype,attrs=attrs)
 
 class RecoverGroupContainer(PyContainer):
     """
-    drop in PyContainer for any base_type not appropriate loader could be found
+    drop in PyContainer for any base_type not appropriate loader could be found.
+    Sub items are collected as list of (name,item) pairs which is only turned
+    into a dict by convert.
     """
-    def __init__(self,h5_attrs, base_type, object_type):
-        super().__init__(h5_attrs, base_type, object_type,_content = {})
     
     def filter(self,h_parent):
         """
         switch base_type to the one loader is missing for
         """
 
-        warnings.warn(
-            "loader '{}' missing for '{}' type object. Data recovered ({})".format(
-                self.base_type,
-                self.object_type.__name__ if not isinstance(self.object_type,AttemptRecoverCustom) else None,
-                h_parent.name.rsplit('/')[-1]
-            ),
-            DataRecoveredWarning
-        )
         manager = ReferenceManager.get_manager(h_parent)
         _,self.base_type,_ = manager.resolve_type(h_parent,base_type_type = -1)
+
+        # report missing loader only once for each base_type and object_type pair
+        if (self.base_type,self.object_type) not in manager._recover_warned:
+            manager._recover_warned.add((self.base_type,self.object_type))
+            warnings.warn(
+                "loader '{}' missing for '{}' type object. Data recovered ({})".format(
+                    self.base_type,
+                    self.object_type.__name__ if not isinstance(self.object_type,AttemptRecoverCustom) else None,
+                    h_parent.name.rsplit('/')[-1]
+                ),
+                DataRecoveredWarning
+            )
         yield from h_parent.items()
 
     def append(self,name,item,h5_attrs):
         if isinstance(item,AttemptRecoverCustom):
-            self._content[name] = item
-        else:
-            self._content[name] = (item,{ key:value for key,value in h5_attrs.items() if key not in {'type'}})
+            self._content.append((name,item))
+            return
+        item_attrs = dict(h5_attrs)
+        item_attrs.pop('type',None)
+        self._content.append((name,(item,item_attrs)))
 
     def convert(self):
-        attrs = {key:value for key,value in self._h5_attrs.items() if key not in {'type'}}
+        # 'type' attribute is dropped by RecoveredGroup
+        attrs = dict(self._h5_attrs)
         attrs['base_type'] = self.base_type
         return RecoveredGroup(self._content,attrs=attrs)
 
@@ -1592,6 +1629,12 @@ LoaderManager.register_class(
     _moc_numpy_array_object_lambda, b'!moc_lambda!', dump_nothing, load_nothing, None, True, 'hickle-4.x'
 )
 
+# py_obj_types restored by fix_lambda_obj_type from the pickle strings stored in
+# the 'type' attribute of the nodes of hickle 4.x files. hickle 4.x pickled the
+# py_obj_type of each node anew, so the same few strings repeat throughout a file.
+# Each of them is passed to pickle.loads only once.
+_fix_lambda_obj_type_cache = {}
+
 def fix_lambda_obj_type(bytes_object, *, fix_imports=True, encoding="ASCII", errors="strict"):
     """
     drop in replacement for pickle.loads method when loading files created by hickle 4.x 
@@ -1605,8 +1648,12 @@ def fix_lambda_obj_type(bytes_object, *, fix_imports=True, encoding="ASCII", err
     """
     if bytes_object is None:
         return object
+    if isinstance(bytes_object, bytes):
+        py_obj_type = _fix_lambda_obj_type_cache.get(bytes_object, None)
+        if py_obj_type is not None:
+            return py_obj_type
     try:
-        return pickle.loads(bytes_object, fix_imports=fix_imports, encoding=encoding, errors=errors)
+        py_obj_type = pickle.loads(bytes_object, fix_imports=fix_imports, encoding=encoding, errors=errors)
     except TypeError:
         warnings.warn(
             "presenting '{!r}' instead of stored lambda 'type'".format(
@@ -1615,3 +1662,6 @@ def fix_lambda_obj_type(bytes_object, *, fix_imports=True, encoding="ASCII", err
             MockedLambdaWarning
         )
         return _moc_numpy_array_object_lambda
+    if isinstance(bytes_object, bytes):
+        _fix_lambda_obj_type_cache[bytes_object] = py_obj_type
+    return py_obj_type
@@ -42,7 +42,7 @@ def generate_py_object():
     some_bytes_list = list(some_bytes)
     some_numbers = tuple(range(50))
     some_floats = tuple( float(f) for f in range(50))
-    mixed = list( f for f in ( some_numbers[i//2] if i & 1 else some_floats[i//2] for i in range(100) ) )
+    mixed = [ value for pair in zip(some_floats,some_numbers) for value in pair ]
     wordlist = ["hello","world","i","like","you"]
     byteslist = [ s.encode("ascii") for s in wordlist]
     mixus = [some_string,some_numbers,12,11]
@@ -10,55 +10,111 @@ Unit tests for hickle module -- lookup functions.
 # %% IMPORTS
 import pytest
 import sys
-import shutil
 import types
 import weakref
+import warnings
 import compileall
 import os
 
 # Package imports
 import re
 import collections
+import functools as ft
 import numpy as np
 import h5py
 import pickle
 from importlib.util import find_spec,spec_from_loader,spec_from_file_location
-from importlib import reload
 from copy import copy
 import os.path
-from py.path import local
 
 # hickle imports
 from hickle.helpers import PyContainer,not_dumpable
 from hickle.loaders import optional_loaders, attribute_prefix
 import hickle.lookup as lookup
-    
-# Set current working directory to the temporary directory
-local.get_temproot().chdir()
+
 
 # %% DATA DEFINITIONS
 
 dummy_data = (1,2,3)
 
+# pickle strings of the builtin types used as py_obj_type entries of the
+# 'hickle_types_table' and 'type' attributes by the ReferenceManager tests
+pickled_types = {
+    py_obj_type: pickle.dumps(py_obj_type)
+    for py_obj_type in (int,list)
+}
+
+# loader of hickle.tests package and directory it loads from used as template
+# by patch_importlib_util_spec_from_tests_loader for the loaders of the
+# hickle_loaders test modules
+tests_loader = find_spec('hickle.tests').loader
+tests_loader_dir = os.path.dirname(tests_loader.path)
+
+# data referred to by h5py.Reference in ExpandReferenceContainer test
+referred_data_values = np.arange(-6,6,dtype = np.int64)
+
+# data of datasets to be recovered by AttemptRecoverCustom tests
+recover_data_values = np.arange(8,dtype = np.float64).reshape(4,2)
+
+# file attribute flagging that the 'custom' loader option is enabled
+custom_option_attr = '{}CUSTOM'.format(attribute_prefix)
+
+# loader specification as passed to LoaderManager.register_class, memoise
+# defaults to True like for register_class
+LoaderSpec = collections.namedtuple(
+    'LoaderSpec',
+    'myclass_type hkl_str dump_function load_function container_class memoise',
+    defaults = (True,)
+)
+
+# patterns matched against error and warning messages, compiled once
+# instead of each time pytest.raises or pytest.warns matches them
+hickle_only_loader_pattern = re.compile(r"loader\s+for\s+'\w+'\s+type\s+managed\s+by\s+hickle\s+only")
+hickle_core_only_loader_pattern = re.compile(r"loader\s+for\s+'\w+'\s+type\s+managed\s+by\s+hickle\s+core\s+only")
+exclude_core_base_type_pattern = re.compile(
+    r"excluding\s+'.+'\s+base_type\s+managed\s+by\s+hickle\s+core\s+not\s+possible"
+)
+register_core_first_pattern = re.compile(
+    r"objects\s+defined\s+by\s+hickle\s+core\s+must\s+be"
+    r"\s+registered\s+before\s+first\s+dump\s+or\s+load"
+)
+dummy_type_ignored_pattern = re.compile(r"ignoring\s+'.+'\s+dummy\s+type\s+not\s+defined\s+by\s+loader\s+module")
+serialized_pattern = re.compile(r".*type\s+not\s+understood,\s+data\s+is\s+serialized:.*")
+
 
 # %% FIXTURES
 
-@pytest.fixture
-def h5_data(request):
+@pytest.fixture(scope='module')
+def h5_file():
     """
-    create dummy hdf5 test data file for testing PyContainer, H5NodeFilterProxy and
-    ReferenceManager. Uses name of executed test as part of filename
+    create dummy hdf5 test data file shared by all tests for testing PyContainer,
+    H5NodeFilterProxy and ReferenceManager. The file is kept in memory only
+    and never written to disk.
     """
 
-    dummy_file = h5py.File('hickle_lookup_{}.hdf5'.format(request.function.__name__),'w')
-    filename = dummy_file.filename
-    test_data = dummy_file.create_group("root_group")
-    yield test_data
+    dummy_file = h5py.File('hickle_lookup.hdf5','w',libver = 'latest',driver = 'core',backing_store = False)
+    yield dummy_file
     if dummy_file:
         dummy_file.close()
 
-@pytest.fixture()
-def loader_table():
+@pytest.fixture
+def h5_data(h5_file,request):
+    """
+    create dummy root group for executed test within shared hdf5 test data file.
+    Uses name of executed test as name of the group. The group is removed
+    again after the test to keep the shared file from growing. Any manager
+    a failing test left registered for the shared file is dropped as well
+    to not break subsequent tests creating their own.
+    """
+
+    test_data = h5_file.create_group(request.node.name)
+    yield test_data
+    lookup.LoaderManager.__managers__.pop(h5_file.id,None)
+    lookup.ReferenceManager.__managers__.pop(h5_file.id,None)
+    h5_file.pop(test_data.name,None)
+
+@pytest.fixture(scope='module')
+def loader_specs():
 
     """
     create a class_register and a exclude_register table for testing
@@ -73,15 +129,6 @@ def loader_table():
     
     """
 
-    # clear loaded_loaders, types_dict, hkl_types_dict and hkl_contianer_dict
-    # to ensure no loader preset by hickle core or hickle loader module
-    # intervenes with test
-    global lookup
-    lookup.LoaderManager.__loaded_loaders__.clear()
-    tuple( True for opt in lookup.LoaderManager.__py_types__.values() if opt.clear() )
-    tuple( True for opt in lookup.LoaderManager.__hkl_functions__.values() if opt.clear() )
-    tuple( True for opt in lookup.LoaderManager.__hkl_container__.values() if opt.clear() )
-
     # simulate loader definitions found within loader modules
     def create_test_dataset(myclass_type,h_group,name,**kwargs):
         return h_group,()
@@ -116,28 +163,77 @@ def loader_table():
         __module__ = "hickle.hickle"
 
     # provide the table
-    yield [
-        (int,b'int',create_test_dataset,load_test_dataset,None,False),
-        (list,b'list',create_test_dataset,None,TestContainer,True),
-        (tuple,b'tuple',None,load_test_dataset,TestContainer),
-        (lookup._DictItem,b'dict_item',None,None,NotHicklePackage),
-        (lookup._DictItem,b'pickle',None,None,HickleLoadersModule),
-        (lookup._DictItem,b'dict_item',lookup.LoaderManager.register_class,None,IsHickleCore)
-    ]
-
-    # cleanup and reload hickle.lookup module to reset it to its initial state
-    # in case hickle.hickle has already been preloaded by pytest also reload it
-    # to ensure no side effects occur during later tests
-    lookup.LoaderManager.__loaded_loaders__.clear()
-    tuple( True for opt in lookup.LoaderManager.__py_types__.values() if opt.clear() )
-    tuple( True for opt in lookup.LoaderManager.__hkl_functions__.values() if opt.clear() )
-    tuple( True for opt in lookup.LoaderManager.__hkl_container__.values() if opt.clear() )
-    
-    reload(lookup)
-    lookup = sys.modules[lookup.__name__]
-    hickle_hickle = sys.modules.get("hickle.hickle",None)
-    if hickle_hickle is not None:
-        reload(hickle_hickle)
+    yield (
+        LoaderSpec(int,b'int',create_test_dataset,load_test_dataset,None,False),
+        LoaderSpec(list,b'list',create_test_dataset,None,TestContainer,True),
+        LoaderSpec(tuple,b'tuple',None,load_test_dataset,TestContainer),
+        LoaderSpec(lookup._DictItem,b'dict_item',None,None,NotHicklePackage),
+        LoaderSpec(lookup._DictItem,b'pickle',None,None,HickleLoadersModule),
+        LoaderSpec(lookup._DictItem,b'dict_item',lookup.LoaderManager.register_class,None,IsHickleCore)
+    )
+
+@pytest.fixture()
+def loader_table(monkeypatch,loader_specs):
+    """
+    provides the loader_specs table to tests registering loaders with
+    empty LoaderManager tables
+    """
+
+    # replace __loaded_loaders__, __py_types__, __hkl_functions__ and __hkl_container__
+    # tables of LoaderManager by empty ones to ensure no loader preset by hickle core
+    # or hickle loader module intervenes with test. The original tables are left
+    # untouched and restored by monkeypatch after test
+    monkeypatch.setattr(lookup.LoaderManager,'__loaded_loaders__',set())
+    for table_name in ('__py_types__','__hkl_functions__','__hkl_container__'):
+        monkeypatch.setattr(
+            lookup.LoaderManager,table_name,
+            { option:{} for option in getattr(lookup.LoaderManager,table_name) }
+        )
+    yield loader_specs
+
+    # drop specs cached by the find_spec replacements to ensure that
+    # no stale spec leaks into later tests
+    patch_importlib_util_find_spec.cache_clear()
+    patch_importlib_util_find_spec_no_load_builtins.cache_clear()
+    patch_hide_collections_loader.cache_clear()
+
+@pytest.fixture(scope='module')
+def legacy_loader_pyc():
+    """
+    provides legacy .pyc file of hickle_loaders/load_builtins test loader module
+    which is loaded by load_loader in case its source is not available. It is
+    compiled only if not present and removed again when no longer needed
+    """
+    import hickle.tests.hickle_loaders.load_builtins as load_builtins
+    pyc_path = load_builtins.__file__ + 'c'
+    compiled = not os.path.isfile(pyc_path)
+    if compiled:
+        compileall.compile_file(load_builtins.__file__,legacy = True,quiet = 1)
+        assert os.path.isfile(pyc_path)
+    yield pyc_path
+    if compiled:
+        os.remove(pyc_path)
+
+@pytest.fixture(scope='module')
+def type_pickle_blobs():
+    """
+    provides the 'hickle_types_table' entries for int and list py_obj_type
+    shared by the ReferenceManager tests. Each entry consists of the pickle
+    string of py_obj_type as (1,n) array of 'S1' items and the base_type
+    """
+    yield {
+        py_obj_type: (np.frombuffer(pickled_types[py_obj_type],dtype = 'S1').reshape(1,-1),base_type)
+        for py_obj_type,base_type in ((int,b'int'),(list,b'list'))
+    }
+
+@pytest.fixture(scope='module')
+def pickled_class_to_dump():
+    """
+    provides the ClassToDump instance stored by create_pickled_dataset test
+    along with its pickle string expected to be found in the dataset
+    """
+    py_object = ClassToDump('hello',1)
+    yield py_object,pickle.dumps(py_object,protocol = lookup._pickle_protocol)
 
 # %% CLASS DEFINITIONS
 
@@ -155,24 +251,25 @@ class ToBeInLoadersOrNotToBe():
     __slots__ = ()
 
     def __reduce_ex__(self,proto = pickle.DEFAULT_PROTOCOL):
-        reduced = super(ToBeInLoadersOrNotToBe,self).__reduce_ex__(proto)
-        for index,item in enumerate(reduced[:1:-1],0):
-            if item is not None:
-                return reduced[:(-index if index > 0 else None)]
-        return reduced
+        reduced = object.__reduce_ex__(self,proto)
+        num_items = len(reduced)
+        while num_items > 2 and reduced[num_items - 1] is None:
+            num_items -= 1
+        return reduced if num_items == len(reduced) else reduced[:num_items]
 
     def __reduce__(self):
-        reduced = super(ToBeInLoadersOrNotToBe,self).__reduce__()
-        for index,item in enumerate(reduced[:1:-1],0):
-            if item is not None:
-                return reduced[:(-index if index > 0 else None)]
-        return reduced
+        reduced = object.__reduce__(self)
+        num_items = len(reduced)
+        while num_items > 2 and reduced[num_items - 1] is None:
+            num_items -= 1
+        return reduced if num_items == len(reduced) else reduced[:num_items]
 
     def __eq__(self,other):
         return other.__class__ is self.__class__
 
     def __ne__(self,other):
-        return self != other
+        return not self.__eq__(other)
+
 class ClassToDump():
     """
     Primary class used to test create_pickled_dataset function
@@ -184,7 +281,7 @@ class ClassToDump():
         return other.__class__ is self.__class__ and self._data == other._data
 
     def __ne__(self,other):
-        return self != other
+        return not self.__eq__(other)
 
 class ClassToDumpCompact(ClassToDump):
     """
@@ -249,7 +346,7 @@ class SimpleClass():
         return other.__class__ is self.__class__ and self.__dict__ == other.__dict__
 
     def __ne__(self,other):
-        return self != other
+        return not self.__eq__(other)
 
 class NoExtendList(list):
     """
@@ -261,7 +358,7 @@ class NoExtendList(list):
     def __getattribute__(self,name):
         if name == "extend":
             raise AttributeError("no extend")
-        return super(NoExtendList,self).__getattribute__(name)
+        return list.__getattribute__(self,name)
 
 # %% FUNCTION DEFINITIONS
 
@@ -281,12 +378,12 @@ def load_anyhing(h_node, base_type , py_obj_type): # pragma: no cover
 def test_AttemptRecoverCustom_classes(h5_data):
     recovered_group = lookup.RecoveredGroup({'hello':1},attrs={'world':2,'type':42})
     assert recovered_group == {'hello':1} and recovered_group.attrs == {'world':2}
-    array_to_recover = np.random.random_sample([4,2])
+    array_to_recover = recover_data_values
     dataset_to_recover = h5_data.create_dataset('to_recover',data=array_to_recover)
     dataset_to_recover.attrs['world'] = 2
     dataset_to_recover.attrs['type'] = 42
     recovered_dataset = lookup.RecoveredDataset(dataset_to_recover[()],dtype=dataset_to_recover.dtype,attrs=dataset_to_recover.attrs)
-    assert np.allclose(recovered_dataset,array_to_recover)
+    assert np.array_equal(recovered_dataset,array_to_recover)
     assert recovered_dataset.dtype == array_to_recover.dtype
     assert recovered_dataset.attrs == {'world':2}
     #recovered = lookup.recover_custom_dataset(dataset_to_recover,'unknown',dataset_to_recover.attrs['type']) 
@@ -303,19 +400,19 @@ def test_LoaderManager_register_class(loader_table):
     # and retrieve its contents from types_dict and hkl_types_dict
     loader_spec = loader_table[0]
     lookup.LoaderManager.register_class(*loader_spec)
-    assert lookup.LoaderManager.__py_types__[None][loader_spec[0]] == (*loader_spec[2:0:-1],loader_spec[5])
-    assert lookup.LoaderManager.__hkl_functions__[None][loader_spec[1]] == loader_spec[3]
+    assert lookup.LoaderManager.__py_types__[None][loader_spec.myclass_type] == (loader_spec.dump_function,loader_spec.hkl_str,loader_spec.memoise)
+    assert lookup.LoaderManager.__hkl_functions__[None][loader_spec.hkl_str] == loader_spec.load_function
     with pytest.raises(KeyError):
-        lookup.LoaderManager.__hkl_container__[None][loader_spec[1]] is None
+        lookup.LoaderManager.__hkl_container__[None][loader_spec.hkl_str] is None
 
     # try to register PyContainer only loader specified by loader_table
     # and retrieve its contents from types_dict and hkl_container_dict
     loader_spec = loader_table[1]
     lookup.LoaderManager.register_class(*loader_spec)
-    assert lookup.LoaderManager.__py_types__[None][loader_spec[0]] == (*loader_spec[2:0:-1],loader_spec[5])
+    assert lookup.LoaderManager.__py_types__[None][loader_spec.myclass_type] == (loader_spec.dump_function,loader_spec.hkl_str,loader_spec.memoise)
     with pytest.raises(KeyError):
-        lookup.LoaderManager.__hkl_functions__[None][loader_spec[1]] is None
-    assert lookup.LoaderManager.__hkl_container__[None][loader_spec[1]] == loader_spec[4]
+        lookup.LoaderManager.__hkl_functions__[None][loader_spec.hkl_str] is None
+    assert lookup.LoaderManager.__hkl_container__[None][loader_spec.hkl_str] == loader_spec.container_class
 
 
     # try to register container without dump_function specified by
@@ -324,29 +421,29 @@ def test_LoaderManager_register_class(loader_table):
     loader_spec = loader_table[2]
     lookup.LoaderManager.register_class(*loader_spec)
     with pytest.raises(KeyError):
-        lookup.LoaderManager.__py_types__[None][loader_spec[0]][1] == loader_spec[1]
-    assert lookup.LoaderManager.__hkl_functions__[None][loader_spec[1]] == loader_spec[3]
-    assert lookup.LoaderManager.__hkl_container__[None][loader_spec[1]] == loader_spec[4]
+        lookup.LoaderManager.__py_types__[None][loader_spec.myclass_type][1] == loader_spec.hkl_str
+    assert lookup.LoaderManager.__hkl_functions__[None][loader_spec.hkl_str] == loader_spec.load_function
+    assert lookup.LoaderManager.__hkl_container__[None][loader_spec.hkl_str] == loader_spec.container_class
 
     # try to register loader shadowing loader preset by hickle core
     # defined by external loader module
     loader_spec = loader_table[3]
-    with pytest.raises(TypeError,match = r"loader\s+for\s+'\w+'\s+type\s+managed\s+by\s+hickle\s+only"):
+    with pytest.raises(TypeError,match = hickle_only_loader_pattern):
         lookup.LoaderManager.register_class(*loader_spec)
     loader_spec = loader_table[4]
 
     # try to register loader shadowing loader preset by hickle core
     # defined by hickle loaders module
-    with pytest.raises(TypeError,match = r"loader\s+for\s+'\w+'\s+type\s+managed\s+by\s+hickle\s+core\s+only"):
+    with pytest.raises(TypeError,match = hickle_core_only_loader_pattern):
         lookup.LoaderManager.register_class(*loader_spec)
 
     # simulate registering loader preset by hickle core
     loader_spec = loader_table[5]
     lookup.LoaderManager.register_class(*loader_spec)
     loader_spec = loader_table[0]
-    lookup.LoaderManager.__hkl_functions__[None][b'!node-reference!'] = loader_spec[3:5]
+    lookup.LoaderManager.__hkl_functions__[None][b'!node-reference!'] = (loader_spec.load_function,loader_spec.container_class)
     with pytest.raises(ValueError):
-        lookup.LoaderManager.register_class(loader_spec[0],b'!node-reference!',*loader_spec[2:],'custom')
+        lookup.LoaderManager.register_class(loader_spec.myclass_type,b'!node-reference!',*loader_spec[2:],'custom')
     lookup.LoaderManager.__hkl_functions__[None].pop(b'!node-reference!')
     with pytest.raises(lookup.LookupError):
         lookup.LoaderManager.register_class(*loader_spec,'mine')
@@ -357,32 +454,36 @@ def test_LoaderManager_register_class_exclude(loader_table):
     """
 
     # try to disable loading of loader preset by hickle core
-    base_type = loader_table[5][1]
+    base_type = loader_table[5].hkl_str
     lookup.LoaderManager.register_class(*loader_table[2])
     lookup.LoaderManager.register_class(*loader_table[5])
-    with pytest.raises(ValueError,match = r"excluding\s+'.+'\s+base_type\s+managed\s+by\s+hickle\s+core\s+not\s+possible"):
+    with pytest.raises(ValueError,match = exclude_core_base_type_pattern):
         lookup.LoaderManager.register_class_exclude(base_type)
 
     # disable any of the other loaders
-    base_type = loader_table[2][1]
+    base_type = loader_table[2].hkl_str
     lookup.LoaderManager.register_class_exclude(base_type)
     with pytest.raises(lookup.LookupError):
         lookup.LoaderManager.register_class_exclude(base_type,'compact')
 
 
+@ft.lru_cache(maxsize=None)
 def patch_importlib_util_find_spec(name,package=None):
     """
     function used to temporarily redirect search for loaders
     to hickle_loader directory in test directory for testing
-    loading of new loaders
+    loading of new loaders. The spec found for name and package
+    is cached as it is requested repeatedly by load_loader tests
     """
     return find_spec("hickle.tests." + name.replace('.','_',1),package)
 
+@ft.lru_cache(maxsize=None)
 def patch_importlib_util_find_spec_no_load_builtins(name,package=None):
     """
     function used to temporarily redirect search for loaders
     to hickle_loader directory in test directory for testing
-    loading of new loaders
+    loading of new loaders. The spec found for name and package
+    is cached as it is requested repeatedly by load_loader tests
     """
     if name in {'hickle.loaders.load_builtins'}:
         return None
@@ -395,9 +496,9 @@ def patch_importlib_util_spec_from_tests_loader(name, loader, *, origin=None, is
     loading of new loaders
     """
     name = name.replace('.','_',1)
-    myloader = copy(sys.modules['hickle.tests'].__loader__)
+    myloader = copy(tests_loader)
     myloader.name = "hickle.tests." + name
-    myloader.path = os.path.join(os.path.dirname(myloader.path),'{}.py'.format(name))
+    myloader.path = os.path.join(tests_loader_dir,'{}.py'.format(name))
     return spec_from_loader(myloader.name,myloader,origin=origin,is_package=is_package)
 
 def patch_importlib_util_spec_from_loader(name, loader, *, origin=None, is_package=None):
@@ -437,6 +538,7 @@ def patch_importlib_util_no_spec_from_file_location(name, location, *, loader=No
     could be found for object
     """
     return None
+@ft.lru_cache(maxsize=None)
 def patch_hide_collections_loader(name,package=None):
     if name in ('hickle.loaders.load_collections'):
         return None
@@ -474,7 +576,7 @@ def test_LoaderManager(loader_table,h5_data):
     assert manager.hkl_container_dict.maps[0] is lookup.LoaderManager.__hkl_container__['custom']
     assert manager.hkl_container_dict.maps[1] is lookup.LoaderManager.__hkl_container__[None]
     assert manager._file.id == h5_data.file.id
-    assert h5_data.attrs.get('{}CUSTOM'.format(attribute_prefix),None)
+    assert h5_data.attrs.get(custom_option_attr,None)
     manager = lookup.LoaderManager(h5_data,False,None)
     assert manager.types_dict.maps[0] is lookup.LoaderManager.__py_types__['custom']
     assert manager.types_dict.maps[1] is lookup.LoaderManager.__py_types__[None]
@@ -483,12 +585,12 @@ def test_LoaderManager(loader_table,h5_data):
     assert manager.hkl_container_dict.maps[0] is lookup.LoaderManager.__hkl_container__['custom']
     assert manager.hkl_container_dict.maps[1] is lookup.LoaderManager.__hkl_container__[None]
     assert manager._file.id == h5_data.file.id
-    h5_data.attrs.pop('{}CUSTOM'.format(attribute_prefix),None)
+    h5_data.attrs.pop(custom_option_attr,None)
     manager = lookup.LoaderManager(h5_data,False,{'custom':False})
     assert manager.types_dict.maps[0] is lookup.LoaderManager.__py_types__[None]
     assert manager.hkl_types_dict.maps[0] is lookup.LoaderManager.__hkl_functions__[None]
     assert manager.hkl_container_dict.maps[0] is lookup.LoaderManager.__hkl_container__[None]
-    assert h5_data.attrs.get('{}CUSTOM'.format(attribute_prefix),h5_data) is h5_data
+    assert h5_data.attrs.get(custom_option_attr,h5_data) is h5_data
 
     with pytest.raises(lookup.LookupError):
         manager = lookup.LoaderManager(h5_data,False,{'compact':True})
@@ -500,7 +602,7 @@ def test_LoaderManager_drop_manager(h5_data):
     """
     loader = lookup.LoaderManager(h5_data)
     lookup.LoaderManager.__managers__[h5_data.file.id] = (loader,)
-    some_other_file = h5py.File('someother.hdf5','w')
+    some_other_file = h5py.File('someother.hdf5','w',libver = 'latest',driver = 'core',backing_store = False)
     some_other_root = some_other_file.create_group('root')
     lookup.LoaderManager._drop_manager(some_other_root.file.id)
     lookup.LoaderManager.__managers__[some_other_file.file.id] = (lookup.LoaderManager(some_other_root),)
@@ -515,7 +617,7 @@ def test_LoaderManager_create_manager(h5_data):
     """
     test public static LoaderManager.create_manager function
     """
-    second_tree = h5_data.file.create_group('seondary_root')
+    second_tree = h5_data.create_group('seondary_root')
     loader = lookup.LoaderManager.create_manager(h5_data)
     assert lookup.LoaderManager.__managers__[h5_data.file.id][0] is loader
     with pytest.raises(lookup.LookupError):
@@ -534,7 +636,7 @@ def test_LoaderManager_context(h5_data):
             pass
     loader.__exit__(None,None,None)
 
-def test_LoaderManager_load_loader(loader_table,h5_data,monkeypatch):
+def test_LoaderManager_load_loader(loader_table,h5_data,monkeypatch,legacy_loader_pyc):
     """
     test LoaderManager.load_loader method
     """
@@ -543,185 +645,189 @@ def test_LoaderManager_load_loader(loader_table,h5_data,monkeypatch):
     # assume loader should be load_builtins loader
     py_object = dict()
     loader_name = "hickle.loaders.load_builtins"
-    with monkeypatch.context() as moc_import_lib:
-        with lookup.LoaderManager.create_manager(h5_data) as loader:
-
-            # hide loader from hickle.lookup.loaded_loaders and check that 
-            # fallback loader for python object is returned
-            moc_import_lib.setattr("importlib.util.find_spec",patch_importlib_util_find_no_spec)
-            moc_import_lib.setattr("hickle.lookup.find_spec",patch_importlib_util_find_no_spec)
-            moc_import_lib.setattr("importlib.util.spec_from_loader",patch_importlib_util_no_spec_from_loader)
-            moc_import_lib.setattr("hickle.lookup.spec_from_loader",patch_importlib_util_no_spec_from_loader)
-            moc_import_lib.setattr("importlib.util.spec_from_file_location",patch_importlib_util_no_spec_from_file_location)
-            moc_import_lib.setattr("hickle.lookup.spec_from_file_location",patch_importlib_util_no_spec_from_file_location)
-            moc_import_lib.delitem(sys.modules,"hickle.loaders.load_builtins",raising=False)
-            py_obj_type,nopickleloader = loader.load_loader(py_object.__class__)
-            assert py_obj_type is object and nopickleloader == (lookup.create_pickled_dataset,b'pickle',True)
 
-            lookup._custom_loader_enabled_builtins[py_obj_type.__class__.__module__] = ('','')
-            py_obj_type,nopickleloader = loader.load_loader(py_object.__class__)
-            assert py_obj_type is object and nopickleloader == (lookup.create_pickled_dataset,b'pickle',True)
-            
-            backup_builtins = sys.modules['builtins']
-            moc_import_lib.delitem(sys.modules,'builtins')
-            with pytest.warns(lookup.PackageImportDropped):# TODO when warning is added run check for warning
-                py_obj_type,nopickleloader = loader.load_loader(py_object.__class__)
-            assert py_obj_type is object and nopickleloader == (lookup.create_pickled_dataset,b'pickle',True)
-            moc_import_lib.setitem(sys.modules,'builtins',backup_builtins)
-
-
-            # redirect load_builtins loader to tests/hickle_loader path
-            moc_import_lib.setattr("importlib.util.spec_from_file_location",patch_importlib_util_spec_from_file_location)
-            moc_import_lib.setattr("hickle.lookup.spec_from_file_location",patch_importlib_util_spec_from_file_location)
-            #py_obj_type,nopickleloader = loader.load_loader(py_object.__class__)
-            #assert py_obj_type is dict and nopickleloader == (lookup.create_pickled_dataset,b'pickle',True)
-            moc_import_lib.setattr("importlib.util.find_spec",patch_importlib_util_find_spec)
-            moc_import_lib.setattr("hickle.lookup.find_spec",patch_importlib_util_find_spec)
-            moc_import_lib.setattr("importlib.util.spec_from_loader",patch_importlib_util_spec_from_loader)
-            moc_import_lib.setattr("hickle.lookup.spec_from_loader",patch_importlib_util_spec_from_loader)
-    
-            # try to find appropriate loader for dict object, a mock of this
-            # loader should be provided by hickle/tests/hickle_loaders/load_builtins
-            # module ensure that this module is the one found by load_loader function
-            import hickle.tests.hickle_loaders.load_builtins as load_builtins
-            moc_import_lib.setitem(sys.modules,loader_name,load_builtins)
-            moc_import_lib.setattr("importlib.util.spec_from_loader",patch_importlib_util_spec_from_tests_loader)
-            moc_import_lib.setattr("hickle.lookup.spec_from_loader",patch_importlib_util_spec_from_tests_loader)
-            py_obj_type,nopickleloader = loader.load_loader(py_object.__class__)
-            assert py_obj_type is dict and nopickleloader == (load_builtins.create_package_test,b'dict',True)
-
-            # simulate loading of package or local loader from hickle_loaders directory
-            backup_load_builtins = sys.modules.pop('hickle.loaders.load_builtins',None)
-            backup_py_obj_type = loader.types_dict.pop(dict,None)
-            backup_loaded_loaders = lookup.LoaderManager.__loaded_loaders__.discard('hickle.loaders.load_builtins')
-            moc_import_lib.setattr("importlib.util.find_spec",patch_importlib_util_find_spec_no_load_builtins)
-            moc_import_lib.setattr("hickle.lookup.find_spec",patch_importlib_util_find_spec_no_load_builtins)
-            py_obj_type,nopickleloader = loader.load_loader(py_object.__class__)
-            assert py_obj_type is dict 
-            assert nopickleloader == (sys.modules['hickle.loaders.load_builtins'].create_package_test,b'dict',True)
-            ## back to start test successful fallback to legacy .pyc in case no source is available for package
-            sys.modules.pop('hickle.loaders.load_builtins','None')
-            loader.types_dict.pop(dict,None)
-            lookup.LoaderManager.__loaded_loaders__.discard('hickle.loaders.load_builtins')
-            pyc_path = load_builtins.__file__ + 'c'
-            if not os.path.isfile(pyc_path):
-                compileall.compile_file(load_builtins.__file__,legacy=True)
-                assert os.path.isfile(pyc_path)
-            base_dir,base_name = os.path.split(load_builtins.__file__)
-            hidden_source = os.path.join(base_dir,'.{}h'.format(base_name))
-            os.rename(load_builtins.__file__,hidden_source)
-            py_obj_type,nopickleloader = loader.load_loader(py_object.__class__)
-            assert py_obj_type is dict 
-            assert nopickleloader == (sys.modules['hickle.loaders.load_builtins'].create_package_test,b'dict',True)
-            #once again just checking that if no legacy .pyc next base is tried
-            sys.modules.pop('hickle.loaders.load_builtins','None')
-            loader.types_dict.pop(dict,None)
-            lookup.LoaderManager.__loaded_loaders__.discard('hickle.loaders.load_builtins')
-            os.remove(pyc_path)
-            py_obj_type,nopickleloader = loader.load_loader(py_object.__class__)
-            assert py_obj_type is object
-            assert nopickleloader == (lookup.create_pickled_dataset,b'pickle',True)
-            os.rename(hidden_source,load_builtins.__file__)
-            moc_import_lib.setattr("importlib.util.spec_from_loader",patch_importlib_util_spec_from_loader)
-            moc_import_lib.setattr("hickle.lookup.spec_from_loader",patch_importlib_util_spec_from_loader)
-            moc_import_lib.setattr("importlib.util.find_spec",patch_importlib_util_find_spec)
-            moc_import_lib.setattr("hickle.lookup.find_spec",patch_importlib_util_find_spec)
-            sys.modules['hickle.loaders.load_builtins'] = backup_load_builtins
-            loader.types_dict[dict] = backup_py_obj_type
-            # not added by missing legacy .pyc test re-add manually here
-            lookup.LoaderManager.__loaded_loaders__.add('hickle.loaders.load_builtins')
-            lookup._custom_loader_enabled_builtins.pop(py_obj_type.__class__.__module__,None)
-    
-            # preload dataset only loader and check that it can be resolved directly
-            loader_spec = loader_table[0]
-            lookup.LoaderManager.register_class(*loader_spec)
-            assert loader.load_loader((12).__class__) == (loader_spec[0],(*loader_spec[2:0:-1],loader_spec[5]))
-    
-            # try to find appropriate loader for dict object, a mock of this
-            # should have already been imported above 
-            assert loader.load_loader(py_object.__class__) == (dict,(load_builtins.create_package_test,b'dict',True))
-    
-            # remove loader again and undo redirection again. dict should now be
-            # processed by create_pickled_dataset
-            moc_import_lib.delitem(sys.modules,loader_name)
-            del lookup.LoaderManager.__py_types__[None][dict]
+    # bind patch methods, patched modules and tables used over and over
+    # again below to locals. Passing the modules instead of dotted path
+    # strings saves monkeypatch from resolving the path on each call
+    setattr_,setitem_,delitem_ = monkeypatch.setattr,monkeypatch.setitem,monkeypatch.delitem
+    importlib_util,modules_ = sys.modules['importlib.util'],sys.modules
+    loaded_loaders_ = lookup.LoaderManager.__loaded_loaders__
+
+    # loader expected for any object falling back to pickle
+    pickle_loader = (lookup.create_pickled_dataset,b'pickle',True)
+
+    def redirect_import(name,replacement):
+        # patch replacement into importlib.util and hickle.lookup alike
+        setattr_(importlib_util,name,replacement)
+        setattr_(lookup,name,replacement)
+
+    with lookup.LoaderManager.create_manager(h5_data) as loader:
+
+        # hide loader from hickle.lookup.loaded_loaders and check that 
+        # fallback loader for python object is returned
+        redirect_import('find_spec',patch_importlib_util_find_no_spec)
+        redirect_import('spec_from_loader',patch_importlib_util_no_spec_from_loader)
+        redirect_import('spec_from_file_location',patch_importlib_util_no_spec_from_file_location)
+        delitem_(modules_,"hickle.loaders.load_builtins",raising=False)
+        py_obj_type,nopickleloader = loader.load_loader(py_object.__class__)
+        assert py_obj_type is object and nopickleloader == pickle_loader
+
+        lookup._custom_loader_enabled_builtins[py_obj_type.__class__.__module__] = ('','')
+        py_obj_type,nopickleloader = loader.load_loader(py_object.__class__)
+        assert py_obj_type is object and nopickleloader == pickle_loader
+        
+        backup_builtins = modules_['builtins']
+        delitem_(modules_,'builtins')
+        with pytest.warns(lookup.PackageImportDropped):# TODO when warning is added run check for warning
             py_obj_type,nopickleloader = loader.load_loader(py_object.__class__)
-            assert py_obj_type is object and nopickleloader == (lookup.create_pickled_dataset,b'pickle',True)
-            
-            # check that load_loader prevents redefinition of loaders to be predefined by hickle core
-            with pytest.raises(
-                RuntimeError,
-                match = r"objects\s+defined\s+by\s+hickle\s+core\s+must\s+be"
-                        r"\s+registered\s+before\s+first\s+dump\s+or\s+load"
-            ):
-                py_obj_type,nopickleloader = loader.load_loader(ToBeInLoadersOrNotToBe)
-            
-            # check that hickle only managed load only loaders without a registered dump function
-            # are properly recognized and reported by LoaderManager.load_loader 
-            loader.register_class( ToBeInLoadersOrNotToBe, b's.pear', None, load_anyhing,None,True)
-            with pytest.raises(
-                RuntimeError,
-                match = r"objects\s+defined\s+by\s+hickle\s+core\s+must\s+be"
-                        r"\s+registered\s+before\s+first\s+dump\s+or\s+load"
-            ):
-                py_obj_type,nopickleloader = loader.load_loader(ToBeInLoadersOrNotToBe)
-            py_obj_type,(create_dataset,base_type,memoise) = loader.load_loader(ToBeInLoadersOrNotToBe,base_type=b's.pear')
-            assert py_obj_type is ToBeInLoadersOrNotToBe
-            assert create_dataset is lookup.not_dumpable and base_type == b's.pear' and memoise == True
-            
-            loader.hkl_types_dict.pop(b's.pear',None)
-            loader.hkl_container_dict.pop(b's.pear',None)
-            loader.types_dict.pop(ToBeInLoadersOrNotToBe,None)
-            moc_import_lib.setattr(ToBeInLoadersOrNotToBe,'__module__','hickle.loaders')
-    
-            # check that load_loaders issues drop warning upon loader definitions for
-            # dummy objects defined within hickle package but outside loaders modules
-            with pytest.warns(
-                RuntimeWarning,
-                match = r"ignoring\s+'.+'\s+dummy\s+type\s+not\s+defined\s+by\s+loader\s+module"
-            ):
-                py_obj_type,nopickleloader = loader.load_loader(ToBeInLoadersOrNotToBe)
-                assert py_obj_type is object #ToBeInLoadersOrNotToBe
-                assert nopickleloader == (lookup.create_pickled_dataset,b'pickle',True)
-    
-            # check that loader definitions for dummy objects defined by loaders work as expected
-            # by loader module 
-            moc_import_lib.setattr(ToBeInLoadersOrNotToBe,'__module__',loader_name)
-            py_obj_type,(create_dataset,base_type,memoise) = loader.load_loader(ToBeInLoadersOrNotToBe)
-            assert py_obj_type is ToBeInLoadersOrNotToBe and base_type == b'NotHicklable'
-            assert create_dataset is not_dumpable
-            assert memoise == False
-    
-            # remove loader_name from list of loaded loaders and check that loader is loaded anew
-            # and that values returned for dict object correspond to loader 
-            # provided by freshly loaded loader module
-            lookup.LoaderManager.__loaded_loaders__.remove(loader_name)
-            py_obj_type,(create_dataset,base_type,memoise) = loader.load_loader(py_object.__class__)
-            load_builtins_moc = sys.modules.get(loader_name,None)
-            assert load_builtins_moc is not None
-            loader_spec = load_builtins_moc.class_register[0]
-            assert py_obj_type is dict and create_dataset is loader_spec[2]
-            assert base_type is loader_spec[1]
-            assert memoise == True
-            # check that package path is properly resolved if package module
-            # for which to find loader for is not found on sys. modules or 
-            # its __spec__ attribute is set to None typically on __main__ or
-            # builtins and other c modules
-            lookup.LoaderManager.__loaded_loaders__.remove(loader_name)
-            backup_module = ClassToDump.__module__
-            moc_import_lib.setattr(ClassToDump,'__module__',re.sub(r'^\s*hickle\.','',ClassToDump.__module__))
-            py_obj_type,(create_dataset,base_type,memoise) = loader.load_loader(ClassToDump)
-            assert py_obj_type is object #ClassToDump
-            assert create_dataset is lookup.create_pickled_dataset
-            assert base_type == b'pickle' and memoise == True
-            ClassToDump.__module__ = backup_module
-            moc_import_lib.setattr("hickle.lookup.find_spec",patch_hide_collections_loader)
-            py_obj_type,(create_dataset,base_type,memoise) = loader.load_loader(collections.OrderedDict)
-            moc_import_lib.setattr("hickle.lookup.find_spec",patch_importlib_util_find_spec)
-            assert py_obj_type is collections.OrderedDict
-            assert create_dataset is sys.modules[loader_name].create_package_test
-            assert base_type == b'dict' and memoise == True
-            
+        assert py_obj_type is object and nopickleloader == pickle_loader
+        setitem_(modules_,'builtins',backup_builtins)
+
+
+        # redirect load_builtins loader to tests/hickle_loader path
+        redirect_import('spec_from_file_location',patch_importlib_util_spec_from_file_location)
+        #py_obj_type,nopickleloader = loader.load_loader(py_object.__class__)
+        #assert py_obj_type is dict and nopickleloader == pickle_loader
+        redirect_import('find_spec',patch_importlib_util_find_spec)
+        redirect_import('spec_from_loader',patch_importlib_util_spec_from_loader)
+
+        # try to find appropriate loader for dict object, a mock of this
+        # loader should be provided by hickle/tests/hickle_loaders/load_builtins
+        # module ensure that this module is the one found by load_loader function
+        import hickle.tests.hickle_loaders.load_builtins as load_builtins
+        dict_loader = (load_builtins.create_package_test,b'dict',True)
+        setitem_(modules_,loader_name,load_builtins)
+        redirect_import('spec_from_loader',patch_importlib_util_spec_from_tests_loader)
+        py_obj_type,nopickleloader = loader.load_loader(py_object.__class__)
+        assert py_obj_type is dict and nopickleloader == dict_loader
+
+        # simulate loading of package or local loader from hickle_loaders directory
+        delitem_(modules_,loader_name,raising=False)
+        backup_py_obj_type = loader.types_dict.pop(dict,None)
+        loaded_loaders_.discard(loader_name)
+        redirect_import('find_spec',patch_importlib_util_find_spec_no_load_builtins)
+        py_obj_type,nopickleloader = loader.load_loader(py_object.__class__)
+        assert py_obj_type is dict 
+        assert nopickleloader == (modules_[loader_name].create_package_test,b'dict',True)
+        ## back to start test successful fallback to legacy .pyc in case no source is available for package
+        delitem_(modules_,loader_name,raising=False)
+        loader.types_dict.pop(dict,None)
+        loaded_loaders_.discard(loader_name)
+        # hide source of loader module from load_loader instead of renaming it
+        hidden_files = {os.path.realpath(load_builtins.__file__)}
+        def open_hiding_files(file,*args,**kwargs):
+            if os.path.realpath(file) in hidden_files:
+                raise FileNotFoundError(file)
+            return open(file,*args,**kwargs)
+        setattr_(lookup,'open',open_hiding_files,raising = False)
+        py_obj_type,nopickleloader = loader.load_loader(py_object.__class__)
+        assert py_obj_type is dict 
+        assert nopickleloader == (modules_[loader_name].create_package_test,b'dict',True)
+        #once again just checking that if no legacy .pyc next base is tried
+        delitem_(modules_,loader_name,raising=False)
+        loader.types_dict.pop(dict,None)
+        loaded_loaders_.discard(loader_name)
+        hidden_files.add(os.path.realpath(legacy_loader_pyc))
+        py_obj_type,nopickleloader = loader.load_loader(py_object.__class__)
+        assert py_obj_type is object
+        assert nopickleloader == pickle_loader
+        hidden_files.clear()
+        redirect_import('spec_from_loader',patch_importlib_util_spec_from_loader)
+        redirect_import('find_spec',patch_importlib_util_find_spec)
+        setitem_(modules_,loader_name,load_builtins)
+        loader.types_dict[dict] = backup_py_obj_type
+        # not added by missing legacy .pyc test re-add manually here
+        loaded_loaders_.add(loader_name)
+        lookup._custom_loader_enabled_builtins.pop(py_obj_type.__class__.__module__,None)
+
+        # preload dataset only loader and check that it can be resolved directly
+        loader_spec = loader_table[0]
+        lookup.LoaderManager.register_class(*loader_spec)
+        assert loader.load_loader((12).__class__) == (loader_spec.myclass_type,(loader_spec.dump_function,loader_spec.hkl_str,loader_spec.memoise))
+
+        # try to find appropriate loader for dict object, a mock of this
+        # should have already been imported above 
+        assert loader.load_loader(py_object.__class__) == (dict,dict_loader)
+
+        # remove loader again and undo redirection again. dict should now be
+        # processed by create_pickled_dataset
+        delitem_(modules_,loader_name)
+        del lookup.LoaderManager.__py_types__[None][dict]
+        py_obj_type,nopickleloader = loader.load_loader(py_object.__class__)
+        assert py_obj_type is object and nopickleloader == pickle_loader
+        
+        # check that load_loader prevents redefinition of loaders to be predefined by hickle core
+        with pytest.raises(
+            RuntimeError,
+            match = register_core_first_pattern
+        ):
+            py_obj_type,nopickleloader = loader.load_loader(ToBeInLoadersOrNotToBe)
+        
+        # check that hickle only managed load only loaders without a registered dump function
+        # are properly recognized and reported by LoaderManager.load_loader 
+        loader.register_class( ToBeInLoadersOrNotToBe, b's.pear', None, load_anyhing,None,True)
+        with pytest.raises(
+            RuntimeError,
+            match = register_core_first_pattern
+        ):
+            py_obj_type,nopickleloader = loader.load_loader(ToBeInLoadersOrNotToBe)
+        py_obj_type,(create_dataset,base_type,memoise) = loader.load_loader(ToBeInLoadersOrNotToBe,base_type=b's.pear')
+        assert py_obj_type is ToBeInLoadersOrNotToBe
+        assert create_dataset is lookup.not_dumpable and base_type == b's.pear' and memoise == True
+        
+        loader.hkl_types_dict.pop(b's.pear',None)
+        loader.hkl_container_dict.pop(b's.pear',None)
+        loader.types_dict.pop(ToBeInLoadersOrNotToBe,None)
+        setattr_(ToBeInLoadersOrNotToBe,'__module__','hickle.loaders')
+
+        # check that load_loaders issues drop warning upon loader definitions for
+        # dummy objects defined within hickle package but outside loaders modules
+        with pytest.warns(
+            RuntimeWarning,
+            match = dummy_type_ignored_pattern
+        ):
+            py_obj_type,nopickleloader = loader.load_loader(ToBeInLoadersOrNotToBe)
+            assert py_obj_type is object #ToBeInLoadersOrNotToBe
+            assert nopickleloader == pickle_loader
+
+        # check that loader definitions for dummy objects defined by loaders work as expected
+        # by loader module 
+        setattr_(ToBeInLoadersOrNotToBe,'__module__',loader_name)
+        py_obj_type,(create_dataset,base_type,memoise) = loader.load_loader(ToBeInLoadersOrNotToBe)
+        assert py_obj_type is ToBeInLoadersOrNotToBe and base_type == b'NotHicklable'
+        assert create_dataset is not_dumpable
+        assert memoise == False
+
+        # remove loader_name from list of loaded loaders and check that loader is loaded anew
+        # and that values returned for dict object correspond to loader 
+        # provided by freshly loaded loader module
+        loaded_loaders_.remove(loader_name)
+        py_obj_type,(create_dataset,base_type,memoise) = loader.load_loader(py_object.__class__)
+        load_builtins_moc = modules_.get(loader_name,None)
+        assert load_builtins_moc is not None
+        loader_spec = load_builtins_moc.class_register[0]
+        assert py_obj_type is dict and create_dataset is loader_spec[2]
+        assert base_type is loader_spec[1]
+        assert memoise == True
+        # check that package path is properly resolved if package module
+        # for which to find loader for is not found on sys. modules or 
+        # its __spec__ attribute is set to None typically on __main__ or
+        # builtins and other c modules
+        loaded_loaders_.remove(loader_name)
+        backup_module = ClassToDump.__module__
+        setattr_(ClassToDump,'__module__',re.sub(r'^\s*hickle\.','',ClassToDump.__module__))
+        py_obj_type,(create_dataset,base_type,memoise) = loader.load_loader(ClassToDump)
+        assert py_obj_type is object #ClassToDump
+        assert create_dataset is lookup.create_pickled_dataset
+        assert base_type == b'pickle' and memoise == True
+        ClassToDump.__module__ = backup_module
+        setattr_(lookup,'find_spec',patch_hide_collections_loader)
+        py_obj_type,(create_dataset,base_type,memoise) = loader.load_loader(collections.OrderedDict)
+        setattr_(lookup,'find_spec',patch_importlib_util_find_spec)
+        assert py_obj_type is collections.OrderedDict
+        assert create_dataset is modules_[loader_name].create_package_test
+        assert base_type == b'dict' and memoise == True
+        
 
 def test_type_legacy_mro():
     """
@@ -740,17 +846,16 @@ def test_type_legacy_mro():
     assert lookup.type_legacy_mro(function_to_dump) == (function_to_dump,)
 
 
-def test_create_pickled_dataset(h5_data,compression_kwargs):
+def test_create_pickled_dataset(h5_data,compression_kwargs,pickled_class_to_dump):
     """
     tests create_pickled_dataset, load_pickled_data function and PickledContainer 
     """
     
     # check if create_pickled_dataset issues SerializedWarning for objects which
     # either do not support copy protocol
-    py_object = ClassToDump('hello',1)
-    pickled_py_object = pickle.dumps(py_object)
+    py_object,pickled_py_object = pickled_class_to_dump
     data_set_name = "greetings"
-    with pytest.warns(lookup.SerializedWarning,match = r".*type\s+not\s+understood,\s+data\s+is\s+serialized:.*") as warner:
+    with pytest.warns(lookup.SerializedWarning,match = serialized_pattern) as warner:
         h5_node,subitems = lookup.create_pickled_dataset(py_object, h5_data,data_set_name,**compression_kwargs)
         assert isinstance(h5_node,h5py.Dataset) and not subitems and iter(subitems)
         assert bytes(h5_node[()]) == pickled_py_object and h5_node.name.rsplit('/',1)[-1] == data_set_name
@@ -790,18 +895,64 @@ def test__moc_numpy_array_object_lambda():
     assert lookup._moc_numpy_array_object_lambda(data) == data[0]
     
 #@pytest.mark.no_compression
-def test_fix_lambda_obj_type():
+def test_fix_lambda_obj_type(monkeypatch):
     """
     test _moc_numpy_array_object_lambda function it self. When invoked
     it should return the first element of the passed list
     """
     assert lookup.fix_lambda_obj_type(None) is object
+
+    # check that a pickle string is passed on to pickle.loads only the
+    # first time and resolved from the cache afterwards
+    pickle_loads = pickle.loads
+    loaded = []
+    def loads_recorded(bytes_object,**kwargs):
+        loaded.append(bytes_object)
+        return pickle_loads(bytes_object,**kwargs)
+    monkeypatch.setattr(lookup,'_fix_lambda_obj_type_cache',{})
+    monkeypatch.setattr(lookup.pickle,'loads',loads_recorded)
     picklestring = pickle.dumps(SimpleClass)
     assert lookup.fix_lambda_obj_type(picklestring) is SimpleClass
+    assert lookup.fix_lambda_obj_type(picklestring) is SimpleClass
+    assert loaded == [picklestring]
     with pytest.warns(lookup.MockedLambdaWarning):
         assert lookup.fix_lambda_obj_type('') is lookup._moc_numpy_array_object_lambda
 
-def test_ReferenceManager_get_root(h5_data):
+def test_fix_lambda_obj_type_legacy_file(monkeypatch):
+    """
+    test that fix_lambda_obj_type passes each distinct pickle string found
+    in the 'type' attributes of a file created by hickle 4.0.0 on to
+    pickle.loads only once
+    """
+    type_strings = []
+    def collect_type_string(name,h_node):
+        type_string = h_node.attrs.get('type',None)
+        if type_string is not None:
+            type_strings.append(type_string)
+    legacy_file_name = os.path.join(os.path.dirname(__file__),'legacy_hkls','hickle_4.0.0.hkl')
+    with h5py.File(legacy_file_name,'r') as legacy_file:
+        legacy_file.visititems(collect_type_string)
+    pickle_loads = pickle.loads
+    loaded = []
+    def loads_recorded(bytes_object,**kwargs):
+        loaded.append(bytes_object)
+        return pickle_loads(bytes_object,**kwargs)
+    monkeypatch.setattr(lookup,'_fix_lambda_obj_type_cache',{})
+    monkeypatch.setattr(lookup.pickle,'loads',loads_recorded)
+    py_obj_types = {}
+    for type_string in type_strings:
+        try:
+            py_obj_types[type_string] = lookup.fix_lambda_obj_type(type_string)
+        except (ModuleNotFoundError,AttributeError):
+            # py_obj_type not importable any more, AttemptRecoverCustom is used instead
+            pass
+    assert len(py_obj_types) < len(type_strings)
+    for type_string in py_obj_types:
+        assert loaded.count(type_string) == 1
+    # hickle 4.0.0 pickled builtin types through dill as calls to dill._dill._load_type
+    assert {int,float,list,tuple,str,bytes,dict} <= set(py_obj_types.values())
+
+def test_ReferenceManager_get_root(h5_data,type_pickle_blobs):
     """
     tests the static ReferenceManager._get_root method
     """
@@ -811,15 +962,12 @@ def test_ReferenceManager_get_root(h5_data):
     # of some data such that ReferenceManager._get_root can resolve
     # h5_data root_group independent which node it was passed
     
-    root_group = h5_data['/root_group']
+    root_group = h5_data
     data_group = root_group.create_group('data')
     content = data_group.create_dataset('mydata',data=12)
     type_table = root_group.create_group('hickle_types_table')
-    int_pickle_string = bytearray(pickle.dumps(int))
-    int_np_entry = np.array(int_pickle_string,copy=False)
-    int_np_entry.dtype = 'S1'
-    int_entry = type_table.create_dataset(str(len(type_table)),data = int_np_entry,shape =(1,int_np_entry.size))
-    int_base_type = b'int'
+    int_np_entry,int_base_type = type_pickle_blobs[int]
+    int_entry = type_table.create_dataset(str(len(type_table)),data = int_np_entry)
     int_base_type = type_table.create_dataset(int_base_type,shape=None,dtype="S1")
     int_entry.attrs['base_type'] = int_base_type.ref
     content.attrs['type'] = int_entry.ref
@@ -840,14 +988,11 @@ def test_ReferenceManager_get_root(h5_data):
     # which should have an already properly assigned 'type' attribute
     # unless reading hickle 4.0.X file or referred to 'hickle_types_table' entry
     # is missing. In both cases file shall be returned as fallback
-    list_pickle_string = bytearray(pickle.dumps(list))
-    list_np_entry = np.array(list_pickle_string,copy = False)
-    list_np_entry.dtype = 'S1'
-    list_entry = type_table.create_dataset(str(len(type_table)),data = list_np_entry,shape=(1,list_np_entry.size))
-    list_base_type = b'list'
+    list_np_entry,list_base_type = type_pickle_blobs[list]
+    list_entry = type_table.create_dataset(str(len(type_table)),data = list_np_entry)
     list_base_type = type_table.create_dataset(list_base_type,shape=None,dtype="S1")
     list_entry.attrs['base_type'] = list_base_type.ref
-    list_group.attrs['type'] = list_pickle_string
+    list_group.attrs['type'] = list_np_entry
     assert lookup.ReferenceManager.get_root(some_list_item).id == root_group.file.id
     list_group.attrs['type'] = list_entry.ref
     assert lookup.ReferenceManager.get_root(some_list_item).id == root_group.id
@@ -862,7 +1007,7 @@ def test_ReferenceManager_get_root(h5_data):
 class not_a_surviver():
     """does not survive pickle.dumps"""
 
-def test_ReferenceManager(h5_data):
+def test_ReferenceManager(h5_data,type_pickle_blobs,tmp_path):
     """
     test for creation of ReferenceManager object (__init__)
     to be run before testing ReferenceManager.create_manager
@@ -873,31 +1018,27 @@ def test_ReferenceManager(h5_data):
     assert isinstance(type_table,h5py.Group)
     reference_manager = lookup.ReferenceManager(h5_data)
     assert reference_manager._py_obj_type_table.id == type_table.id
-    false_root = h5_data.file.create_group('false_root')
+    false_root = h5_data.create_group('false_root')
     false_root.create_dataset('hickle_types_table',data=12)
     with pytest.raises(lookup.ReferenceError):
         reference_manager = lookup.ReferenceManager(false_root)
-    int_pickle_string = bytearray(pickle.dumps(int))
-    int_np_entry = np.array(int_pickle_string,copy=False)
-    int_np_entry.dtype = 'S1'
-    int_entry = type_table.create_dataset(str(len(type_table)),data = int_np_entry,shape =(1,int_np_entry.size))
-    int_base_type = b'int'
-    int_base_type = type_table.create_dataset(int_base_type,shape=None,dtype="S1")
+    int_np_entry,int_base_type = type_pickle_blobs[int]
+    list_np_entry,list_base_type = type_pickle_blobs[list]
+    missing_np_entry = np.frombuffer(pickle.dumps(not_a_surviver),dtype = 'S1').reshape(1,-1)
+    missing_base_type = b'lost'
+
+    # create all py_obj_type entries and base_type entries first and link
+    # them through their 'base_type' attributes afterwards
+    int_entry,list_entry,missing_entry = (
+        type_table.create_dataset(str(index),data = np_entry)
+        for index,np_entry in enumerate((int_np_entry,list_np_entry,missing_np_entry))
+    )
+    int_base_type,list_base_type,missing_base_type = (
+        type_table.create_dataset(base_type,shape=None,dtype="S1")
+        for base_type in (int_base_type,list_base_type,missing_base_type)
+    )
     int_entry.attrs['base_type'] = int_base_type.ref
-    list_pickle_string = bytearray(pickle.dumps(list))
-    list_np_entry = np.array(list_pickle_string,copy = False)
-    list_np_entry.dtype = 'S1'
-    list_entry = type_table.create_dataset(str(len(type_table)),data = list_np_entry,shape=(1,list_np_entry.size))
-    list_base_type = b'list'
-    list_base_type = type_table.create_dataset(list_base_type,shape=None,dtype="S1")
     list_entry.attrs['base_type'] = list_base_type.ref
-
-    missing_pickle_string = bytearray(pickle.dumps(not_a_surviver))
-    missing_np_entry = np.array(missing_pickle_string,copy = False)
-    missing_np_entry.dtype = 'S1'
-    missing_entry = type_table.create_dataset(str(len(type_table)),data = missing_np_entry,shape=(1,missing_np_entry.size))
-    missing_base_type = b'lost'
-    missing_base_type = type_table.create_dataset(missing_base_type,shape=None,dtype="S1")
     missing_entry.attrs['base_type'] = missing_base_type.ref
     hide_not_a_surviver = globals().pop('not_a_surviver',None)
     reference_manager = lookup.ReferenceManager(h5_data)
@@ -928,22 +1069,19 @@ def test_ReferenceManager(h5_data):
         reference_manager = lookup.ReferenceManager(h5_data)
     list_entry.attrs['base_type']=backup_attr
     
-    old_hickle_file_root = h5_data.file.create_group('old_root')
-    h5_data.file.flush()
+    old_hickle_file_root = h5_data.create_group('old_root')
     base_name,ext = h5_data.file.filename.rsplit('.',1)
-    file_name = "{}_ro.{}".format(base_name,ext)
+    file_name = str(tmp_path / "{}_{}_ro.{}".format(base_name,h5_data.name.rsplit('/',1)[-1],ext))
     data_name = h5_data.name
-    data_file_name = h5_data.file.filename
-    #################### NOTE #############################
-    # h5_data ficture is invalidated by the following line
-    # as well as all Groups and Datasets read from it
-    # manually reopen it and do not forget to close at
-    # end of iths test
-    h5_data.file.close()
-    shutil.copy(data_file_name,file_name)
+    old_data_name = old_hickle_file_root.name
+
+    # h5_data fixture is shared with other tests and thus can not be closed
+    # copy its content to a separate file and reopen it for reading only
+    with h5py.File(file_name,'w',libver = 'latest') as read_only_copy:
+        h5_data.copy(h5_data,read_only_copy,name = data_name)
     read_only_handle = h5py.File(file_name,'r')
     h5_read_data = read_only_handle[data_name]
-    h5_read_old = read_only_handle['old_root']
+    h5_read_old = read_only_handle[old_data_name]
     reference_manager = lookup.ReferenceManager(h5_read_old)
     assert isinstance(reference_manager._overlay,weakref.finalize)
     overlay_file = reference_manager._py_obj_type_table.file
@@ -976,7 +1114,7 @@ def test_ReferenceManager_drop_manager(h5_data):
     """
     reference_manager = lookup.ReferenceManager(h5_data)
     lookup.ReferenceManager.__managers__[h5_data.file.id] = (reference_manager,h5_data)
-    some_other_file = h5py.File('someother.hdf5','w')
+    some_other_file = h5py.File('someother.hdf5','w',libver = 'latest',driver = 'core',backing_store = False)
     some_other_root = some_other_file.create_group('root')
     lookup.ReferenceManager._drop_manager(some_other_root.file.id)
     lookup.ReferenceManager.__managers__[some_other_file.file.id] = (lookup.ReferenceManager(some_other_root),some_other_root)
@@ -991,14 +1129,14 @@ def test_ReferenceManager_create_manager(h5_data):
     """
     test public static ReferenceManager.create_manager function
     """
-    second_tree = h5_data.file.create_group('seondary_root')
+    second_tree = h5_data.create_group('seondary_root')
     h5_data_table = lookup.ReferenceManager.create_manager(h5_data)
     assert lookup.ReferenceManager.__managers__[h5_data.file.id][0] is h5_data_table
     with pytest.raises(lookup.LookupError):
         second_table = lookup.ReferenceManager.create_manager(second_tree)
     lookup.ReferenceManager._drop_manager(h5_data.file.id)
 
-def test_ReferenceManager_context(h5_data):
+def test_ReferenceManager_context(h5_data,tmp_path):
     """
     test use of ReferenceManager as context manager
     """
@@ -1009,19 +1147,15 @@ def test_ReferenceManager_context(h5_data):
         with memo as memo2:
             pass
     memo.__exit__(None,None,None)
-    old_hickle_file_root = h5_data.file.create_group('old_root')
-    h5_data.file.flush()
+    old_hickle_file_root = h5_data.create_group('old_root')
     base_name,ext = h5_data.file.filename.rsplit('.',1)
-    file_name = "{}_ro.{}".format(base_name,ext)
-    data_file_name = h5_data.file.filename
+    file_name = str(tmp_path / "{}_{}_ro.{}".format(base_name,h5_data.name.rsplit('/',1)[-1],ext))
     data_name = old_hickle_file_root.name
-    #################### NOTE #############################
-    # h5_data ficture is invalidated by the following line
-    # as well as all Groups and Datasets read from it
-    # manually reopen it and do not forget to close at
-    # end of iths test
-    h5_data.file.close()
-    shutil.copy(data_file_name,file_name)
+
+    # h5_data fixture is shared with other tests and thus can not be closed
+    # copy its content to a separate file and reopen it for reading only
+    with h5py.File(file_name,'w',libver = 'latest') as read_only_copy:
+        h5_data.copy(old_hickle_file_root,read_only_copy,name = data_name)
     read_only_handle = h5py.File(file_name,'r')
     h5_read_data = read_only_handle[data_name]
     with lookup.ReferenceManager.create_manager(h5_read_data) as memo:
@@ -1036,25 +1170,25 @@ def test_ReferenceManager_store_type(h5_data,compression_kwargs):
     """
     h_node = h5_data.create_group('some_list')
     with lookup.ReferenceManager.create_manager(h5_data) as memo:
-        memo.store_type(h_node,object,None,**compression_kwargs)
+        assert memo.store_type(h_node,object,None,**compression_kwargs) is None
         assert len(memo._py_obj_type_table) == 0 and not memo._py_obj_type_link and not memo._base_type_link
         with pytest.raises(lookup.LookupError):
             memo.store_type(h_node,list,None,**compression_kwargs)
         with pytest.raises(ValueError):
             memo.store_type(h_node,list,b'',**compression_kwargs)
-        memo.store_type(h_node,list,b'list',**compression_kwargs)
+        stored_entry = memo.store_type(h_node,list,b'list',**compression_kwargs)
         assert isinstance(h_node.attrs['type'],h5py.Reference)
         type_table_entry = h5_data.file[h_node.attrs['type']]
+        assert type_table_entry == stored_entry
         assert pickle.loads(type_table_entry[()]) is list
         assert isinstance(type_table_entry.attrs['base_type'],h5py.Reference)
-        assert h5_data.file[type_table_entry.attrs['base_type']].name.rsplit('/',1)[-1].encode('ascii') == b'list'
+        assert h5py.h5i.get_name(h5_data.file[type_table_entry.attrs['base_type']].id).rsplit(b'/',1)[-1] == b'list'
     
 @pytest.mark.no_compression
 def test_ReferenceManager_get_manager(h5_data):
     h_node = h5_data.create_group('some_list')
-    item_data = np.array(memoryview(b'hallo welt lore grueszet dich ipsum aus der lore von ipsum gelort in ipsum'),copy=False)
-    item_data.dtype = 'S1'
-    h_item = h_node.create_dataset('0',data=item_data,shape=(1,item_data.size))
+    item_data = np.frombuffer(b'hallo welt lore grueszet dich ipsum aus der lore von ipsum gelort in ipsum',dtype = 'S1').reshape(1,-1)
+    h_item = h_node.create_dataset('0',data=item_data)
     with lookup.ReferenceManager.create_manager(h5_data) as memo:
         memo.store_type(h_node,list,b'list')
         memo.store_type(h_item,bytes,b'bytes')
@@ -1068,6 +1202,40 @@ def test_ReferenceManager_get_manager(h5_data):
     with pytest.raises(lookup.ReferenceError):
         manager = lookup.ReferenceManager.get_manager(h_item)
 
+@pytest.mark.no_compression
+@pytest.mark.parametrize(
+    'node_name,expected',
+    (
+        ('invalid_pickle_and_ref',None),
+        ('pickled_data',((object,b'pickle',False),)),
+        ('shared_ref',((lookup.NodeReference,b'!node-reference!',True),)),
+        ('old_style_typed',((int,b'int',False),(int,'int',False))),
+        ('broken_old_style',None)
+    )
+)
+def test_ReferenceManager_resolve_type_preset(h5_data,node_name,expected):
+    """
+    test ReferenceManager.resolve_type method on nodes the 'type' of which was set
+    by hickle 4.x or is implied by the kind of node. If expected is None resolve_type
+    is expected to raise ReferenceError
+    """
+    h5_data.create_group('invalid_pickle_and_ref')
+    pickled_data = h5_data.create_dataset('pickled_data',shape = (0,),dtype = np.uint8)
+    h5_data.create_dataset('shared_ref',data = pickled_data.ref,dtype = h5py.ref_dtype)
+    int_data = np.array(12)
+    old_style_typed = h5_data.create_dataset('old_style_typed',data = int_data)
+    old_style_typed.attrs['type'] = np.array(pickled_types[int])
+    old_style_typed.attrs['base_type'] = b'int'
+    broken_old_style = h5_data.create_dataset('broken_old_style',data = int_data)
+    broken_old_style.attrs['type'] = 12
+    broken_old_style.attrs['base_type'] = b'int'
+    with lookup.ReferenceManager.create_manager(h5_data) as memo:
+        if expected is None:
+            with pytest.raises(lookup.ReferenceError):
+                memo.resolve_type(h5_data[node_name])
+        else:
+            assert memo.resolve_type(h5_data[node_name]) in expected
+
 @pytest.mark.no_compression
 def test_ReferenceManager_resolve_type(h5_data):
     """
@@ -1077,31 +1245,28 @@ def test_ReferenceManager_resolve_type(h5_data):
     a h5py.Group or h5py.Reference both of which are to be handled by PyContainer
     objects.
     """
-    invalid_pickle_and_ref = h5_data.create_group('invalid_pickle_and_ref')
-    pickled_data = h5_data.create_dataset('pickled_data',data = bytearray())
-    shared_ref = h5_data.create_dataset('shared_ref',data = pickled_data.ref,dtype = h5py.ref_dtype)
-    old_style_typed = h5_data.create_dataset('old_style_typed',data = 12)
-    old_style_typed.attrs['type'] = np.array(pickle.dumps(int))
-    old_style_typed.attrs['base_type'] = b'int'
-    broken_old_style = h5_data.create_dataset('broken_old_style',data = 12)
-    broken_old_style.attrs['type'] = 12
-    broken_old_style.attrs['base_type'] = b'int'
-    new_style_typed = h5_data.create_dataset('new_style_typed',data = 12)
-    stale_new_style = h5_data.create_dataset('stale_new_style',data = 12)
+    # all int typed datasets share the same scalar value, create them
+    # from one numpy array of its own to avoid inferring type and shape
+    # of the value for each of them anew
+    int_data = np.array(12)
+    new_style_typed,stale_new_style = (
+        h5_data.create_dataset(name,data = int_data)
+        for name in ('new_style_typed','stale_new_style')
+    )
     new_style_typed_no_link = h5_data.create_dataset('new_style_typed_no_link',data = 12.5)
     has_not_recoverable_type = h5_data.create_dataset('no_recoverable_type',data = 42.56)
     with lookup.ReferenceManager.create_manager(h5_data) as memo:
-        with pytest.raises(lookup.ReferenceError):
-            memo.resolve_type(invalid_pickle_and_ref)
-        assert memo.resolve_type(pickled_data) == (object,b'pickle',False)
-        assert memo.resolve_type(shared_ref) == (lookup.NodeReference,b'!node-reference!',True)
-        assert memo.resolve_type(old_style_typed) in ((int,b'int',False),(int,'int',False))
-        with pytest.raises(lookup.ReferenceError):
-            info = memo.resolve_type(broken_old_style)
+
+        def forget_type(entry,py_obj_type):
+            # drop both links between py_obj_type and its entry within
+            # 'hickle_types_table' from memo
+            memo._py_obj_type_link.pop(entry.id,None)
+            memo._py_obj_type_link.pop(id(py_obj_type),None)
+
         memo.store_type(new_style_typed,int,b'int')
-        entry_id = len(memo._py_obj_type_table)
-        memo.store_type(stale_new_style,list,b'list')
-        assert pickle.loads(memo._py_obj_type_table[str(entry_id)][()]) is list
+        list_entry = memo.store_type(stale_new_style,list,b'list')
+        entry_name = list_entry.name
+        assert pickle.loads(list_entry[()]) is list
         stale_list_base = memo._py_obj_type_table['list'].ref
         # remove py_obj_type entry and base_type_entry for list entry
         # while h5py 2 raises a value error if not active link exists for a
@@ -1111,47 +1276,44 @@ def test_ReferenceManager_resolve_type(h5_data):
         # the removed entries to simulate that somebody has removed them from
         # a hickle file before it was passed to hickle.load for restoring its
         # content.
-        memo._py_obj_type_link.pop(memo._py_obj_type_table[str(entry_id)].id,None)
-        memo._py_obj_type_link.pop(id(list),None)
+        forget_type(list_entry,list)
+        list_entry = None
         memo._base_type_link.pop(memo._py_obj_type_table['list'].id,None)
         memo._base_type_link.pop(b'list',None)
-        del memo._py_obj_type_table[str(entry_id)]
+        del memo._py_obj_type_table[entry_name]
         del memo._py_obj_type_table['list']
         memo._py_obj_type_table.file.flush()
         with pytest.raises(lookup.ReferenceError):
             memo.resolve_type(stale_new_style)
-        entry_id = len(memo._py_obj_type_table)
-        memo.store_type(new_style_typed_no_link,float,b'float')
-        float_entry = memo._py_obj_type_table[str(entry_id)]
+        float_entry = memo.store_type(new_style_typed_no_link,float,b'float')
         assert pickle.loads(float_entry[()]) is float
-        float_base = float_entry.attrs['base_type']
+        # keep the attribute manager of float_entry for reading and
+        # modifying its 'base_type' attribute below
+        float_attrs = float_entry.attrs
+        float_base = float_attrs['base_type']
         # remove float entry and clear all references to it see above 
-        del memo._py_obj_type_link[float_entry.id]
-        del memo._py_obj_type_link[id(float)]
-        del float_entry.attrs['base_type']
+        forget_type(float_entry,float)
+        del float_attrs['base_type']
         memo._py_obj_type_table.file.flush()
         assert memo.resolve_type(new_style_typed_no_link) in ((float,b'pickle',False),(float,'pickle',False))
-        del memo._py_obj_type_link[float_entry.id]
-        del memo._py_obj_type_link[id(float)]
+        forget_type(float_entry,float)
         # create stale reference to not existing base_type entry
         memo._py_obj_type_table.create_dataset('list',shape=None,dtype='S1')
-        float_entry.attrs['base_type'] = memo._py_obj_type_table['list'].ref
+        float_attrs.modify('base_type',memo._py_obj_type_table['list'].ref)
         memo._py_obj_type_table.pop('list',None)
         memo._py_obj_type_table.file.flush()
         with pytest.raises(lookup.ReferenceError):
             info = memo.resolve_type(new_style_typed_no_link)
-        memo._py_obj_type_link.pop(float_entry.id,None)
-        memo._py_obj_type_link.pop(id(float),None)
+        forget_type(float_entry,float)
         del memo._base_type_link[memo._py_obj_type_table[float_base].id]
         del memo._base_type_link[b'float']
-        float_entry.attrs['base_type'] = float_base
+        float_attrs.modify('base_type',float_base)
         memo._py_obj_type_table.file.flush()
         assert memo.resolve_type(new_style_typed_no_link) in ((float,b'float',False),(float,'float',False))
         
         assert memo.resolve_type(new_style_typed_no_link) 
         memo.store_type(has_not_recoverable_type,not_a_surviver,b'lost')
-        del memo._py_obj_type_link[memo._py_obj_type_link[id(not_a_surviver)].id]
-        del memo._py_obj_type_link[id(not_a_surviver)]
+        forget_type(memo._py_obj_type_link[id(not_a_surviver)],not_a_surviver)
         hide_not_a_surviver = globals().pop('not_a_surviver',None)
         assert memo.resolve_type(has_not_recoverable_type) == (lookup.AttemptRecoverCustom,b'!recover!',False)
         assert memo.resolve_type(has_not_recoverable_type,base_type_type=2) == (lookup.AttemptRecoverCustom,b'lost',False)
@@ -1169,27 +1331,27 @@ def test_ExpandReferenceContainer(h5_data):
     test ExpandReferenceContainer which resolves object link stored as h5py.Reference
     type dataset
     """
-    expected_data = np.random.randint(-13,13,12)
+    expected_data = referred_data_values
     referred_data = h5_data.create_dataset('referred_data',data = expected_data)
     referring_node = h5_data.create_dataset('referring_node',data = referred_data.ref,dtype = h5py.ref_dtype)
     h5_data.file.flush()
     sub_container = lookup.ExpandReferenceContainer(referring_node.attrs,b'!node-reference!',lookup.NodeReference)
-    content = None
+    content = np.empty(expected_data.shape,dtype = expected_data.dtype)
     for name,subitem in sub_container.filter(referring_node):
         assert name == 'referred_data' and subitem.id == referred_data.id
-        content = np.array(subitem[()])
+        subitem.read_direct(content)
         sub_container.append(name,content,subitem.attrs)
-    assert np.all(sub_container.convert()==expected_data)
+    assert np.array_equal(sub_container.convert(),expected_data)
     referring_node = h5_data.create_dataset('stale_reference',shape=(),dtype=h5py.ref_dtype)
     sub_container = lookup.ExpandReferenceContainer(referring_node.attrs,b'!node-reference!',lookup.NodeReference)
     with pytest.raises(lookup.ReferenceError):
         for name,subitem in sub_container.filter(referring_node):
-            content = np.array(subitem[()])
+            subitem.read_direct(content)
             sub_container.append(name,content,subitem.attrs)
 
 @pytest.mark.no_compression
 def test_recover_custom_data(h5_data):
-    array_to_recover = np.random.random_sample([4,2])
+    array_to_recover = recover_data_values
     with lookup.ReferenceManager.create_manager(h5_data) as memo:
         dataset_to_recover = h5_data.create_dataset('to_recover',data=array_to_recover)
         dataset_to_recover.attrs['world'] = 2
@@ -1205,9 +1367,17 @@ def test_recover_custom_data(h5_data):
         assert issubclass(py_obj_type,lookup.AttemptRecoverCustom) and base_type == b'!recover!'
         with pytest.warns(lookup.DataRecoveredWarning):
             recovered = lookup.recover_custom_dataset(dataset_to_recover,base_type,py_obj_type) 
-        assert recovered.dtype == array_to_recover.dtype and np.all(recovered == array_to_recover)
+        assert recovered.dtype == array_to_recover.dtype and np.array_equal(recovered,array_to_recover)
         assert recovered.attrs == {'base_type':b'myclass','world':2}
         assert not is_group
+
+        # any further data recovered for the same base_type and py_obj_type
+        # shall not be reported again
+        with warnings.catch_warnings():
+            warnings.simplefilter('error',lookup.DataRecoveredWarning)
+            recovered_again = lookup.recover_custom_dataset(dataset_to_recover,base_type,py_obj_type) 
+        assert np.array_equal(recovered_again,array_to_recover)
+        memo._recover_warned.clear()
         type_entry = memo._py_obj_type_table[group_to_recover.attrs['type']]
         memo._py_obj_type_link.pop(type_entry.id,None)
         some_int=group_to_recover.create_dataset('some_int',data=42)
@@ -1238,66 +1408,80 @@ if __name__ == "__main__":
     from _pytest.monkeypatch import monkeypatch
     from _pytest.fixtures import FixtureRequest
     from hickle.tests.conftest import compression_kwargs
+    import tempfile
+    import pathlib
 
-    for h5_root in h5_data(FixtureRequest(test_create_pickled_dataset)):
+    # directory receiving the read only copies of the in memory test file
+    tmp_path = pathlib.Path(tempfile.mkdtemp())
+
+    # run all tests within one in memory file never written to disk
+    shared_file = h5py.File('hickle_lookup.hdf5','w',libver = 'latest',driver = 'core',backing_store = False)
+    specs = next(loader_specs())
+
+    for h5_root in h5_data(shared_file,FixtureRequest(test_create_pickled_dataset)):
         test_AttemptRecoverCustom_classes(h5_data)
-    for table in loader_table():
+    for table in ( tab for mpatch in monkeypatch() for tab in loader_table(mpatch,specs) ):
         test_LoaderManager_register_class(table)
-    for table in loader_table():
+    for table in ( tab for mpatch in monkeypatch() for tab in loader_table(mpatch,specs) ):
         test_LoaderManager_register_class_exclude(table)
     for table,h5_root in (
         (tab,root)
-        for tab in loader_table()
-        for root in h5_data(FixtureRequest(test_LoaderManager))
+        for mpatch in monkeypatch()
+        for tab in loader_table(mpatch,specs)
+        for root in h5_data(shared_file,FixtureRequest(test_LoaderManager))
     ):
         test_LoaderManager(table,h5_root)
-    for h5_root in h5_data(FixtureRequest(test_LoaderManager_drop_manager)):
+    for h5_root in h5_data(shared_file,FixtureRequest(test_LoaderManager_drop_manager)):
         test_LoaderManager_drop_manager(h5_root)
-    for h5_root in h5_data(FixtureRequest(test_LoaderManager_create_manager)):
+    for h5_root in h5_data(shared_file,FixtureRequest(test_LoaderManager_create_manager)):
         test_LoaderManager_create_manager(h5_root)
-    for h5_root in h5_data(FixtureRequest(test_LoaderManager_context)):
+    for h5_root in h5_data(shared_file,FixtureRequest(test_LoaderManager_context)):
         test_LoaderManager_context(h5_root)
-    for table,h5_root,monkey in (
-        (tab,root,mpatch)
-        for tab in loader_table()
-        for root in h5_data(FixtureRequest(test_LoaderManager_load_loader))
+    for table,h5_root,monkey,pyc_path in (
+        (tab,root,mpatch,pyc)
         for mpatch in monkeypatch()
+        for tab in loader_table(mpatch,specs)
+        for root in h5_data(shared_file,FixtureRequest(test_LoaderManager_load_loader))
+        for pyc in legacy_loader_pyc()
     ):
-            test_LoaderManager_load_loader(table,h5_root,monkey)
+            test_LoaderManager_load_loader(table,h5_root,monkey,pyc_path)
     test_type_legacy_mro()
     for h5_root,keywords in (
-        ( h5_data(request),compression_kwargs(request) )
+        ( h5_data(shared_file,request),compression_kwargs(request) )
         for request in (FixtureRequest(test_create_pickled_dataset),)
     ):
-        test_create_pickled_dataset(h5_root,keywords)
+        test_create_pickled_dataset(h5_root,keywords,next(pickled_class_to_dump()))
     test__DictItemContainer()
     test__moc_numpy_array_object_lambda()
-    test_fix_lambda_obj_type()
-    test_fix_lambda_obj_type()
-    for h5_root in h5_data(FixtureRequest(test_ReferenceManager_get_root)):
-        test_ReferenceManager_get_root(h5_root)
-    for h5_root in h5_data(FixtureRequest(test_ReferenceManager)):
-        test_ReferenceManager(h5_root)
-    for h5_root in h5_data(FixtureRequest(test_ReferenceManager_drop_manager)):
+    for mpatch in monkeypatch():
+        test_fix_lambda_obj_type(mpatch)
+    for mpatch in monkeypatch():
+        test_fix_lambda_obj_type_legacy_file(mpatch)
+    for blobs in type_pickle_blobs():
+        for h5_root in h5_data(shared_file,FixtureRequest(test_ReferenceManager_get_root)):
+            test_ReferenceManager_get_root(h5_root,blobs)
+        for h5_root in h5_data(shared_file,FixtureRequest(test_ReferenceManager)):
+            test_ReferenceManager(h5_root,blobs,tmp_path)
+    for h5_root in h5_data(shared_file,FixtureRequest(test_ReferenceManager_drop_manager)):
         test_ReferenceManager_drop_manager(h5_root)
-    for h5_root in h5_data(FixtureRequest(test_ReferenceManager_create_manager)):
+    for h5_root in h5_data(shared_file,FixtureRequest(test_ReferenceManager_create_manager)):
         test_ReferenceManager_create_manager(h5_root)
-    for h5_root in h5_data(FixtureRequest(test_ReferenceManager_context)):
-        test_ReferenceManager_context(h5_root)
-    for h5_root in h5_data(FixtureRequest(test_ReferenceManager_get_manager)):
+    for h5_root in h5_data(shared_file,FixtureRequest(test_ReferenceManager_context)):
+        test_ReferenceManager_context(h5_root,tmp_path)
+    for h5_root in h5_data(shared_file,FixtureRequest(test_ReferenceManager_get_manager)):
         test_ReferenceManager_get_manager(h5_root)
     for h5_root,compression_kwargs in (
-            h5_data(FixtureRequest(test_ReferenceManager_store_type))
+            h5_data(shared_file,FixtureRequest(test_ReferenceManager_store_type))
     ):
         test_ReferenceManager_store_type(h5_root,compression_kwargs)
-    for h5_root in h5_data(FixtureRequest(test_ReferenceManager_resolve_type)):
+    for h5_root in h5_data(shared_file,FixtureRequest(test_ReferenceManager_resolve_type)):
         test_ReferenceManager_resolve_type(h5_root)
-    for h5_root in h5_data(FixtureRequest(test_ExpandReferenceContainer)):
+    for h5_root in h5_data(shared_file,FixtureRequest(test_ExpandReferenceContainer)):
         test_ExpandReferenceContainer(h5_root)
-    for h5_root in h5_data(FixtureRequest(test_ExpandReferenceContainer)):
+    for h5_root in h5_data(shared_file,FixtureRequest(test_ExpandReferenceContainer)):
         test_recover_custom_data(h5_data)
 
 
     
     
-
+    shared_file.close()
@@ -9,7 +9,6 @@ Unit tests for hickle module -- builtins loader.
 
 import pytest
 import collections
-import itertools
 
 # %% IMPORTS
 # Package imports
@@ -30,20 +29,35 @@ local.get_temproot().chdir()
 
 dummy_data = (1,2,3)
 
+# sentinel returned by next() for exhausted subitems iterables
+no_subitem = object()
+
+# h5py 3 and newer store bytes as variable length strings unless
+# explicitly told to use fixed length dtype
+h5py_3 = h5.version.version_tuple[0] >= 3
+
 # %% FIXTURES
 
+@pytest.fixture(scope='module')
+def h5_file():
+    """
+    create dummy hdf5 test data file shared by all tests. The file is kept
+    in memory only and never written to disk.
+    """
+    dummy_file = h5.File('load_builtins.hdf5','w',driver = 'core',backing_store = False)
+    yield dummy_file
+    dummy_file.close()
+
 @pytest.fixture
-def h5_data(request):
+def h5_data(h5_file,request):
     """
-    create dummy hdf5 test data file providing parent group
-    hosting created datasets and groups. Name of test function
-    is included in filename
+    create dummy parent group hosting the datasets and groups created by
+    the executed test within shared hdf5 test data file. Uses name of
+    executed test as name of the group which is removed after the test.
     """
-    dummy_file = h5.File('load_builtins_{}.hdf5'.format(request.function.__name__),'w')
-    filename = dummy_file.filename
-    test_data = dummy_file.create_group("root_group")
+    test_data = h5_file.create_group(request.node.name)
     yield test_data
-    dummy_file.close()
+    h5_file.pop(test_data.name,None)
 
 
 # %% FUNCTION DEFINITIONS
@@ -57,14 +71,14 @@ def test_scalar_dataset(h5_data,compression_kwargs):
     floatvalue = 5.2
     h_dataset,subitems= load_builtins.create_scalar_dataset(floatvalue,h5_data,"floatvalue",**compression_kwargs)
     assert isinstance(h_dataset,h5.Dataset) and h_dataset[()] == floatvalue
-    assert not [ item for item in subitems ]
+    assert next(iter(subitems),no_subitem) is no_subitem
     assert load_builtins.load_scalar_dataset(h_dataset,b'float',float) == floatvalue
 
     # check that integer value less than 64 bit is stored as int
     intvalue = 11
     h_dataset,subitems = load_builtins.create_scalar_dataset(intvalue,h5_data,"intvalue",**compression_kwargs)
     assert isinstance(h_dataset,h5.Dataset) and h_dataset[()] == intvalue
-    assert not [ item for item in subitems ]
+    assert next(iter(subitems),no_subitem) is no_subitem
     assert load_builtins.load_scalar_dataset(h_dataset,b'int',int) == intvalue
 
     # check that integer larger than 64 bit is stored as ASCII byte string
@@ -72,7 +86,7 @@ def test_scalar_dataset(h5_data,compression_kwargs):
     h_dataset,subitems = load_builtins.create_scalar_dataset(non_mappable_int,h5_data,"non_mappable_int",**compression_kwargs)
     assert isinstance(h_dataset,h5.Dataset)
     assert bytearray(h_dataset[()]) == str(non_mappable_int).encode('utf8')
-    assert not [ item for item in subitems ]
+    assert next(iter(subitems),no_subitem) is no_subitem
     assert load_builtins.load_scalar_dataset(h_dataset,b'int',int) == non_mappable_int
 
     # check that integer larger than 64 bit is stored as ASCII byte string
@@ -80,17 +94,16 @@ def test_scalar_dataset(h5_data,compression_kwargs):
     h_dataset,subitems = load_builtins.create_scalar_dataset(non_mappable_neg_int,h5_data,"non_mappable_neg_int",**compression_kwargs)
     assert isinstance(h_dataset,h5.Dataset)
     assert bytearray(h_dataset[()]) == str(non_mappable_neg_int).encode('utf8')
-    assert not [ item for item in subitems ]
+    assert next(iter(subitems),no_subitem) is no_subitem
     assert load_builtins.load_scalar_dataset(h_dataset,b'int',int) == non_mappable_neg_int
 
 def test_load_hickle_4_0_X_string(h5_data):
     string_data = "just test me as utf8 string"
     bytes_data = string_data.encode('utf8')
-    if h5.version.version_tuple[0] >= 3:
-        utf_entry = h5_data.create_dataset('utf_entry',data = string_data)#,dtype = 'U{}'.format(len(string_data)))
+    utf_entry = h5_data.create_dataset('utf_entry',data = string_data)
+    if h5py_3:
         bytes_entry = h5_data.create_dataset('bytes_entry',data = bytes_data,dtype = 'S{}'.format(len(bytes_data)))
     else:
-        utf_entry = h5_data.create_dataset('utf_entry',data = string_data)
         bytes_entry = h5_data.create_dataset('bytes_entry',data = bytes_data)
     assert load_builtins.load_hickle_4_x_string(utf_entry,b'str',str) == string_data
     bytes_entry.attrs['str_type'] = b'str'
@@ -105,7 +118,7 @@ def test_non_dataset(h5_data,compression_kwargs):
     """
     h_dataset,subitems = load_builtins.create_none_dataset(None,h5_data,"None_value",**compression_kwargs)
     assert isinstance(h_dataset,h5.Dataset) and h_dataset.shape is None and h_dataset.dtype == 'V1'
-    assert not [ item for item in subitems ]
+    assert next(iter(subitems),no_subitem) is no_subitem
     assert load_builtins.load_none_dataset(h_dataset,b'None',None.__class__) is None
 
 
@@ -118,14 +131,14 @@ def test_listlike_dataset(h5_data,compression_kwargs):
     empty_tuple = ()
     h_dataset,subitems = load_builtins.create_listlike_dataset(empty_tuple, h5_data, "empty_tuple",**compression_kwargs)
     assert isinstance(h_dataset,h5.Dataset) and h_dataset.size is None
-    assert not subitems and iter(subitems)
+    assert next(iter(subitems),no_subitem) is no_subitem
     assert load_builtins.load_list_dataset(h_dataset,b'tuple',tuple) == empty_tuple
 
     # check that string data is stored properly stored as array of bytes
     # which supports compression
     stringdata = "string_data"
     h_dataset,subitems = load_builtins.create_listlike_dataset(stringdata, h5_data, "string_data",**compression_kwargs)
-    assert isinstance(h_dataset,h5.Dataset) and not [ item for item in subitems ]
+    assert isinstance(h_dataset,h5.Dataset) and next(iter(subitems),no_subitem) is no_subitem
     assert bytearray(h_dataset[()]).decode("utf8") == stringdata
     assert h_dataset.attrs["str_type"] in ('str',b'str')
     assert load_builtins.load_list_dataset(h_dataset,b'str',str) == stringdata
@@ -134,7 +147,7 @@ def test_listlike_dataset(h5_data,compression_kwargs):
     # supports compression
     bytesdata = b'bytes_data'
     h_dataset,subitems = load_builtins.create_listlike_dataset(bytesdata, h5_data, "bytes_data",**compression_kwargs)
-    assert isinstance(h_dataset,h5.Dataset) and not [ item for item in subitems ]
+    assert isinstance(h_dataset,h5.Dataset) and next(iter(subitems),no_subitem) is no_subitem
     assert bytes(h_dataset[()]) == bytesdata
     assert h_dataset.attrs["str_type"] in ('bytes',b'bytes')
     assert load_builtins.load_list_dataset(h_dataset,b'bytes',bytes) == bytesdata
@@ -148,7 +161,7 @@ def test_listlike_dataset(h5_data,compression_kwargs):
     # check that list of single type is stored as dataset of same type
     homogenous_list = [ 1, 2, 3, 4, 5, 6]
     h_dataset,subitems = load_builtins.create_listlike_dataset(homogenous_list,h5_data,"homogenous_list",**compression_kwargs)
-    assert isinstance(h_dataset,h5.Dataset) and not [ item for item in subitems ]
+    assert isinstance(h_dataset,h5.Dataset) and next(iter(subitems),no_subitem) is no_subitem
     assert h_dataset[()].tolist() == homogenous_list and h_dataset.dtype == int
     assert load_builtins.load_list_dataset(h_dataset,b'list',list) == homogenous_list
 
@@ -156,7 +169,7 @@ def test_listlike_dataset(h5_data,compression_kwargs):
     # is stored using a dataset 
     mixed_dtype_list = [ 1, 2.5, 3.8, 4, 5, 6]
     h_dataset,subitems = load_builtins.create_listlike_dataset(mixed_dtype_list,h5_data,"mixed_dtype_list",**compression_kwargs)
-    assert isinstance(h_dataset,h5.Dataset) and not [ item for item in subitems ]
+    assert isinstance(h_dataset,h5.Dataset) and next(iter(subitems),no_subitem) is no_subitem
     assert h_dataset[()].tolist() == mixed_dtype_list and h_dataset.dtype == float
     assert load_builtins.load_list_dataset(h_dataset,b'list',list) == mixed_dtype_list
 
@@ -169,9 +182,10 @@ def test_listlike_dataset(h5_data,compression_kwargs):
     item_name = "data{:d}"
     index = -1 
     loaded_list = load_builtins.ListLikeContainer(h_dataset.attrs,b'list',list)
-    subitems1,subitems2 = itertools.tee(subitems,2)
+    # subitems are iterated twice, keep them
+    subitems = tuple(subitems)
     index_from_string = load_builtins.ListLikeContainer(h_dataset.attrs,b'list',list)
-    for index,(name,item,attrs,kwargs) in enumerate(iter(subitems1)):
+    for index,(name,item,attrs,kwargs) in enumerate(subitems):
         assert item_name.format(index) == name and item == not_so_homogenous_list[index]
         assert attrs == {"item_index":index} and kwargs == compression_kwargs
         if isinstance(item,list):
@@ -190,7 +204,7 @@ def test_listlike_dataset(h5_data,compression_kwargs):
     # for any of the list items.
     no_num_items = {key:value for key,value in h_dataset.attrs.items() if key != "num_items"}
     no_num_items_container = load_builtins.ListLikeContainer(no_num_items,b'list',list)
-    for index,(name,item,attrs,kwargs) in enumerate(iter(subitems2)):
+    for index,(name,item,attrs,kwargs) in enumerate(subitems):
         assert item_name.format(index) == name and item == not_so_homogenous_list[index]
         assert attrs == {"item_index":index} and kwargs == compression_kwargs
         item_dataset = h_dataset.get(name,None)
@@ -235,6 +249,7 @@ def test_listlike_dataset(h5_data,compression_kwargs):
         with pytest.raises(IndexError, match = r"Index\s+\d+\s+already\s+set"):
             loaded_list.append(name,item,{"item_index":index-1})
     assert index + 1 == len(object_list)
+    assert loaded_list.convert() == object_list
 
     # assert that list of strings where first string has length 1 is properly mapped
     # to group
@@ -294,7 +309,7 @@ def test_set_container(h5_data,compression_kwargs):
     test_set_2 = set(b"hello world")
     h_setdataset,subitems = load_builtins.create_setlike_dataset(test_set_2,h5_data,"test_set_2",**compression_kwargs)
     assert isinstance(h_setdataset,h5.Dataset) and set(h_setdataset[()]) == test_set_2
-    assert not subitems and iter(subitems)
+    assert next(iter(subitems),no_subitem) is no_subitem
     assert load_builtins.load_list_dataset(h_setdataset,b'set',set) == test_set_2
 
     # check that set containing byte strings is stored as group
@@ -308,7 +323,7 @@ def test_set_container(h5_data,compression_kwargs):
     # check that empty set is represented by empty dataset
     h_setdataset,subitems = load_builtins.create_setlike_dataset(set(),h5_data,"empty_set",**compression_kwargs)
     assert isinstance(h_setdataset,h5.Dataset) and h_setdataset.size == 0
-    assert not subitems and iter(subitems)
+    assert next(iter(subitems),no_subitem) is no_subitem
     assert load_builtins.load_list_dataset(h_setdataset,b'set',set) == set()
     
 
@@ -424,32 +439,32 @@ def test_dictlike_dataset(h5_data,compression_kwargs):
 if __name__ == "__main__":
     from _pytest.fixtures import FixtureRequest
     from hickle.tests.conftest import compression_kwargs
+
+    # run all tests within one in memory file never written to disk
+    shared_file = h5.File('load_builtins.hdf5','w',driver = 'core',backing_store = False)
     for h5_root,keywords in (
-        ( h5_data(request),compression_kwargs(request) )
+        ( h5_data(shared_file,request),compression_kwargs(request) )
         for request in (FixtureRequest(test_scalar_dataset),)
     ):
         test_scalar_dataset(h5_root,keywords)
     for h5_root,keywords in (
-        ( h5_data(request),compression_kwargs(request) )
+        ( h5_data(shared_file,request),compression_kwargs(request) )
         for request in (FixtureRequest(test_non_dataset),)
     ):
         test_non_dataset(h5_root,keywords)
     for h5_root,keywords in (
-        ( h5_data(request),compression_kwargs(request) )
+        ( h5_data(shared_file,request),compression_kwargs(request) )
         for request in (FixtureRequest(test_listlike_dataset),)
     ):
         test_listlike_dataset(h5_root,keywords)
     for h5_root,keywords in (
-        ( h5_data(request),compression_kwargs(request) )
+        ( h5_data(shared_file,request),compression_kwargs(request) )
         for request in (FixtureRequest(test_set_container),)
     ):
         test_set_container(h5_root,keywords)
     for h5_root,keywords in (
-        ( h5_data(request),compression_kwargs(request) )
+        ( h5_data(shared_file,request),compression_kwargs(request) )
         for request in (FixtureRequest(test_dictlike_dataset),)
     ):
         test_dictlike_dataset(h5_root,keywords)
-
-    
-    
-
+    shared_file.close()
@@ -28,8 +28,10 @@ def h5_data(request):
     """
     create dummy hdf5 test data file for testing PyContainer and H5NodeFilterProxy
     """
-    dummy_file = h5.File('test_load_builtins.hdf5','w')
-    dummy_file = h5.File('load_numpy_{}.hdf5'.format(request.function.__name__),'w')
+    dummy_file = h5.File(
+        'load_numpy_{}.hdf5'.format(request.function.__name__),'w',
+        driver = 'core',backing_store = False
+    )
     filename = dummy_file.filename
     test_data = dummy_file.create_group("root_group")
     yield test_data
@@ -120,7 +120,7 @@ def test_recursive_dump(h5_data,compression_kwargs):
             with pytest.warns(lookup.SerializedWarning):
                 hickle._dump(data, h5_data, "pickled_dict",memo,loader,**compression_kwargs)
             dumped_data = h5_data["pickled_dict"]
-            assert bytes(dumped_data[()]) == pickle.dumps(data)
+            assert bytes(dumped_data[()]) == pickle.dumps(data,protocol = lookup._pickle_protocol)
             loader.types_dict.maps.pop(0)
             memo[id(data)] = memo_backup
     